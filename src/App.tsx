@@ -13,15 +13,16 @@ import type { SafetyDecision, CommandResult } from "./lib/types.js";
 import { SafetyPolicy } from "./lib/safety.js";
 import { SessionManagerImpl } from "./lib/session.js";
 import { TelemetryEmitterImpl } from "./lib/telemetry.js";
-import { Logger } from "./lib/logger.js";
+import { Logger, utcSeconds } from "./lib/logger.js";
 import { CommandScoreboard } from "./lib/scoreboard.js";
 import {
   PlanState,
   PlanStepState,
-  buildPlannerHistory,
+  PlannerHistory,
   convertPlannerPlan,
   determineStatus,
   serializeResult,
+  withPlanProgress,
 } from "./lib/planState.js";
 
 import { GoalPrompt } from "./components/GoalPrompt.js";
@@ -35,6 +36,21 @@ import { useCommandExec } from "./hooks/useCommandExec.js";
 // Types
 // ---------------------------------------------------------------------------
 
+// Decision used for every command when safety checks are turned off; the
+// policy is never consulted.
+const SAFETY_DISABLED_DECISION: SafetyDecision = {
+  level: "low",
+  requireConfirmation: false,
+};
+
+// Only the most recent chat replies are kept for session metadata; a long
+// conversational goal would otherwise grow the record without bound.
+const MAX_CONVERSATION_MESSAGES = 32;
+
+// ":"-prefixed meta commands accepted at the goal prompt.
+const NEW_SESSION_META: ReadonlySet<string> = new Set(["new", "new-session", "newsession"]);
+const SESSION_INFO_META: ReadonlySet<string> = new Set(["session", "info"]);
+
 type PhaseState =
   | { phase: "idle" }
   | { phase: "planning" }
@@ -61,6 +77,7 @@ export interface AppProps {
   logger: Logger;
   plannerInfo: Record<string, string>;
   safetyDisabled: boolean;
+  autoAcceptLowRisk?: boolean;
 }
 
 // ---------------------------------------------------------------------------
@@ -75,6 +92,7 @@ export function App({
   logger,
   plannerInfo,
   safetyDisabled,
+  autoAcceptLowRisk = false,
 }: AppProps) {
   const { exit } = useApp();
 
@@ -86,6 +104,9 @@ export function App({
   // ---- Cross-goal state (refs — don't drive re-renders directly) ----
   const currentGoalRef = useRef("");
   const goalHistoryRef = useRef<CommandResult[]>([]);
+  // Planner turns are kept in step with goalHistoryRef so each planning round
+  // only converts the newest result.
+  const plannerHistoryRef = useRef(new PlannerHistory());
   const activePlanRef = useRef<PlanState | null>(null);
   const scoreboardRef = useRef(new CommandScoreboard());
   const sessionManagerRef = useRef(initialSessionManager);
@@ -101,6 +122,7 @@ export function App({
 
   const resetGoalState = useCallback(() => {
     goalHistoryRef.current = [];
+    plannerHistoryRef.current = new PlannerHistory();
     activePlanRef.current = null;
     plannerCompletedRef.current = false;
     userCancelledRef.current = false;
@@ -108,6 +130,19 @@ export function App({
     conversationRef.current = [];
   }, []);
 
+  const assessCommand = useCallback(
+    (command: string): SafetyDecision =>
+      safetyDisabled ? SAFETY_DISABLED_DECISION : policy.evaluate(command),
+    [policy, safetyDisabled]
+  );
+
+  const appendResult = useCallback((result: CommandResult) => {
+    // Appended in place: nothing holds on to an earlier snapshot of the
+    // goal's history, and copying it per command made a goal O(n^2).
+    goalHistoryRef.current.push(result);
+    plannerHistoryRef.current.append(result);
+  }, []);
+
   const startPlanning = useCallback(() => {
     setPhaseState({ phase: "planning" });
     setPlanningKey((k) => k + 1);
@@ -125,8 +160,16 @@ export function App({
         conversationRef.current.length > 0 ||
         activePlanRef.current
       ) {
-        // Session recording
-        const serializedSteps = history.map(serializeResult);
+        // Session recording: steps, risk levels and notes in one pass.
+        const serializedSteps: Record<string, unknown>[] = [];
+        // Unassessed (safety off) steps record a null risk level.
+        const riskLevels: (string | null)[] = [];
+        const safetyNotes: string[] = [];
+        for (const r of history) {
+          serializedSteps.push(serializeResult(r));
+          riskLevels.push(r.safetyDisabled ? null : r.riskLevel);
+          if (r.safetyNotes) safetyNotes.push(r.safetyNotes);
+        }
         const metadata: Record<string, unknown> = {
           planner_completed: plannerCompletedRef.current,
           user_cancelled: userCancelledRef.current,
@@ -134,14 +177,11 @@ export function App({
         };
         if (plannerErrorRef.current) metadata["planner_error"] = plannerErrorRef.current;
         if (history.length > 0) {
-          metadata["risk_levels"] = history.map((r) => r.riskLevel);
-          const safetyNotes = history
-            .filter((r) => r.safetyNotes)
-            .map((r) => r.safetyNotes);
+          metadata["risk_levels"] = riskLevels;
           if (safetyNotes.length > 0) metadata["safety_notes"] = safetyNotes;
         }
         if (conversationRef.current.length > 0)
-          metadata["conversation"] = conversationRef.current;
+          metadata["conversation"] = conversationRef.current.slice();
         if (safetyDisabled) metadata["safety_disabled"] = true;
         if (activePlanRef.current)
           metadata["plan"] = activePlanRef.current.toDict();
@@ -161,8 +201,8 @@ export function App({
     let cancelled = false;
 
     (async () => {
-      const history = buildPlannerHistory(
-        goalHistoryRef.current,
+      const history = withPlanProgress(
+        plannerHistoryRef.current.turns,
         activePlanRef.current
       );
       const goal = currentGoalRef.current;
@@ -192,27 +232,26 @@ export function App({
         if (newPlan) {
           activePlanRef.current = newPlan;
           // Bug Fix #1: inject plan_acknowledged turn so planner knows plan was received
-          goalHistoryRef.current = [
-            ...goalHistoryRef.current,
-            {
-              suggestedCommand: "__plan_acknowledged__",
-              executedCommand: "__plan_acknowledged__",
-              stdout: [`Plan received: ${newPlan.summary ?? "no summary"}`],
-              stderr: [],
-              returncode: 0,
-              riskLevel: "low",
-              context: {},
-            },
-          ];
-          // Telemetry
-          telemetry.emitPlanCreated(
-            goal,
-            sessionManagerRef.current.enabled
-              ? sessionManagerRef.current.sessionId
-              : null,
-            plannerInfo,
-            newPlan.toDict()
-          );
+          appendResult({
+            suggestedCommand: "__plan_acknowledged__",
+            executedCommand: "__plan_acknowledged__",
+            stdout: `Plan received: ${newPlan.summary ?? "no summary"}`,
+            stderr: "",
+            returncode: 0,
+            riskLevel: "low",
+            context: {},
+          });
+          // Telemetry (skip building the plan snapshot when it is off)
+          if (telemetry.enabled) {
+            telemetry.emitPlanCreated(
+              goal,
+              sessionManagerRef.current.enabled
+                ? sessionManagerRef.current.sessionId
+                : null,
+              plannerInfo,
+              newPlan.toDict()
+            );
+          }
           logger.info(`Planner provided plan with ${newPlan.steps.length} steps`);
           setPhaseState({ phase: "showPlan", plan: newPlan });
         } else {
@@ -224,7 +263,9 @@ export function App({
 
       if (suggestion.mode === "chat") {
         const message = suggestion.message ?? "";
-        conversationRef.current = [...conversationRef.current, message];
+        const conversation = conversationRef.current;
+        conversation.push(message);
+        if (conversation.length > MAX_CONVERSATION_MESSAGES) conversation.shift();
         plannerCompletedRef.current = true;
         logger.info(`Planner chat response: ${message}`);
         setPhaseState({ phase: "showChat", message });
@@ -253,20 +294,38 @@ export function App({
 
       // Show scoreboard warning if command has bad history
       const [, priorStats] = scoreboardRef.current.analyze(cmd);
-      if (
-        priorStats &&
-        priorStats.failures >= Math.max(1, priorStats.successes)
-      ) {
+      const struggling =
+        priorStats !== null &&
+        priorStats.failures >= Math.max(1, priorStats.successes);
+      if (struggling) {
         logger.warning(
           `Command history warning: ${priorStats.successes}s/${priorStats.failures}f`
         );
       }
 
-      const safetyDecision = safetyDisabled
-        ? { level: "low" as const, requireConfirmation: false }
-        : policy.evaluate(cmd);
+      const safetyDecision = assessCommand(cmd);
 
       logger.info(`Command suggested risk=${safetyDecision.level}: ${cmd}`);
+
+      // Auto-accept only commands the policy actually rated low risk; with
+      // safety off there is no rating to trust, so the user still reviews.
+      if (
+        autoAcceptLowRisk &&
+        !safetyDisabled &&
+        !struggling &&
+        safetyDecision.level === "low" &&
+        !safetyDecision.requireConfirmation
+      ) {
+        logger.info("Command auto-accepted (low risk)");
+        setPhaseState({
+          phase: "executing",
+          command: cmd,
+          originalSuggestion: cmd,
+          safetyDecision,
+        });
+        return;
+      }
+
       setPhaseState({ phase: "reviewing", suggestion: cmd, safetyDecision });
     })();
 
@@ -283,98 +342,108 @@ export function App({
     return () => clearTimeout(timer);
   }, [phaseState]);
 
-  // ---- Execute command when phase becomes "executing" ----
+  // ---- Execute the command and record its result ----
   useEffect(() => {
     if (phaseState.phase !== "executing") return;
-    const { command } = phaseState;
+    const { command, originalSuggestion, safetyDecision } = phaseState;
+    let cancelled = false;
 
     // Mark current plan step as in_progress BEFORE execution
     const activePlan = activePlanRef.current;
-    const activeStep = activePlan?.currentStep() ?? null;
-    if (activePlan && activeStep) {
-      activePlan.markRunning(activeStep.id);
+    const runningStep = activePlan?.currentStep() ?? null;
+    if (activePlan && runningStep) {
+      activePlan.markRunning(runningStep.id);
     }
 
     logger.info(`Executing command: ${command}`);
-    cmdExec.execute(command);
-  }, [phaseState]); // phaseState object identity changes each transition
-
-  // ---- Handle command completion ----
-  useEffect(() => {
-    if (phaseState.phase !== "executing") return;
-    if (cmdExec.running || cmdExec.exitCode === null) return;
-
-    const { command, originalSuggestion, safetyDecision } = phaseState;
-
-    const result: CommandResult = {
-      suggestedCommand: originalSuggestion,
-      executedCommand: command,
-      stdout: cmdExec.stdout,
-      stderr: cmdExec.stderr,
-      returncode: cmdExec.exitCode,
-      riskLevel: safetyDecision.level,
-      context: {},
-      safetyNotes: safetyDecision.notes ?? null,
-    };
-
-    // Scoreboard
-    const [normKey, stats] = scoreboardRef.current.record(
-      command,
-      result.returncode === 0
-    );
-    result.normalizedCommand = normKey;
-    result.score = stats.toDict();
+    // The run resolves with its own output, so completion never reads the
+    // previous command's exit code from hook state.
+    cmdExec.execute(command).then((output) => {
+      if (cancelled) return;
 
-    // Plan tracking
-    const activePlan = activePlanRef.current;
-    const activeStep = activePlan?.currentStep() ?? null;
-    if (activePlan && activeStep) {
-      const histIdx = goalHistoryRef.current.length;
-      activePlan.recordResult(activeStep.id, result.returncode === 0, histIdx);
-      result.planStepId = activeStep.id;
-      result.planStepStatus = activeStep.status;
-
-      // Telemetry: plan update
-      telemetry.emitPlanUpdate(
-        currentGoalRef.current,
-        sessionManagerRef.current.enabled
-          ? sessionManagerRef.current.sessionId
-          : null,
-        plannerInfo,
-        activePlan.toDict(),
-        activeStep.id,
-        activeStep.status
+      const result: CommandResult = {
+        suggestedCommand: originalSuggestion,
+        executedCommand: command,
+        stdout: output.stdout,
+        stderr: output.stderr,
+        returncode: output.exitCode,
+        riskLevel: safetyDecision.level,
+        context: {
+          started_at: utcSeconds(output.startedAt),
+          duration_ms: output.durationMs,
+        },
+        safetyNotes: safetyDecision.notes ?? null,
+      };
+      if (safetyDisabled) result.safetyDisabled = true;
+
+      // Scoreboard
+      const [normKey, stats] = scoreboardRef.current.record(
+        command,
+        result.returncode === 0
       );
-    }
+      result.normalizedCommand = normKey;
+      result.score = stats.toDict();
 
-    // Telemetry: execution
-    telemetry.emitExecution(
-      currentGoalRef.current,
-      sessionManagerRef.current.enabled
+      const sessionId = sessionManagerRef.current.enabled
         ? sessionManagerRef.current.sessionId
-        : null,
-      plannerInfo,
-      {
-        command,
-        suggested_command: result.suggestedCommand,
-        executed_command: result.executedCommand,
-        risk_level: result.riskLevel,
-        exit_code: result.returncode,
-        risk_notes: result.safetyNotes,
-        normalized_command: result.normalizedCommand,
-        command_score: result.score,
-        plan_step_id: result.planStepId,
-        plan_step_status: result.planStepStatus,
+        : null;
+
+      // Plan tracking
+      const activeStep = activePlan?.currentStep() ?? null;
+      if (activePlan && activeStep) {
+        const histIdx = goalHistoryRef.current.length;
+        activePlan.recordResult(activeStep.id, result.returncode === 0, histIdx);
+        result.planStepId = activeStep.id;
+        result.planStepStatus = activeStep.status;
+
+        // Telemetry: plan update
+        if (telemetry.enabled) {
+          telemetry.emitPlanUpdate(
+            currentGoalRef.current,
+            sessionId,
+            plannerInfo,
+            activePlan.toDict(),
+            activeStep.id,
+            activeStep.status
+          );
+        }
+      }
+
+      // Telemetry: execution
+      if (telemetry.enabled) {
+        telemetry.emitExecution(
+          currentGoalRef.current,
+          sessionId,
+          plannerInfo,
+          {
+            command,
+            suggested_command: result.suggestedCommand,
+            executed_command: result.executedCommand,
+            risk_level: result.safetyDisabled ? null : result.riskLevel,
+            exit_code: result.returncode,
+            risk_notes: result.safetyNotes,
+            normalized_command: result.normalizedCommand,
+            command_score: result.score,
+            plan_step_id: result.planStepId,
+            plan_step_status: result.planStepStatus,
+          }
+        );
       }
-    );
 
-    logger.info(
-      `Command finished exit=${result.returncode} risk=${result.riskLevel}`
-    );
+      logger.info(
+        `Command finished exit=${result.returncode} risk=${
+          result.safetyDisabled ? "off" : result.riskLevel
+        }`
+      );
+
+      appendResult(result);
+      startPlanning();
+    });
 
-    goalHistoryRef.current = [...goalHistoryRef.current, result];
-    startPlanning();
-  }, [phaseState, cmdExec.running, cmdExec.exitCode]);
+    return () => {
+      cancelled = true;
+    };
+  }, [phaseState]); // phaseState object identity changes each transition
 
   // ---- Review action handler ----
   const handleReviewAction = useCallback(
@@ -393,30 +462,34 @@ export function App({
       }
 
       // accept
+      // An edited command is judged on its own text, not the suggestion's.
       const safetyDecision =
-        phaseState.phase === "reviewing" ? phaseState.safetyDecision : policy.evaluate(command);
+        phaseState.phase === "reviewing" && command === phaseState.suggestion
+          ? phaseState.safetyDecision
+          : assessCommand(command);
       const originalSuggestion =
         phaseState.phase === "reviewing" ? phaseState.suggestion : command;
       setPhaseState({ phase: "executing", command, originalSuggestion, safetyDecision });
     },
-    [phaseState, policy, finishGoal, logger]
+    [phaseState, assessCommand, finishGoal, logger]
   );
 
   // ---- Meta command handler ----
   const handleMeta = useCallback(
     (meta: string) => {
-      if (["new", "new-session", "newsession"].includes(meta)) {
+      if (NEW_SESSION_META.has(meta)) {
         sessionManagerRef.current = sessionManagerRef.current.startNew();
+        policy.clearCache();
         logger.info(
           `Started new session id=${sessionManagerRef.current.sessionId}`
         );
-      } else if (["session", "info"].includes(meta)) {
+      } else if (SESSION_INFO_META.has(meta)) {
         // Info is displayed inline via the idle prompt area
       } else {
         logger.warning(`Unknown meta command: ${meta}`);
       }
     },
-    [logger]
+    [policy, logger]
   );
 
   // ---- Goal submission ----
@@ -473,7 +546,7 @@ export function App({
               onMeta={(meta) => {
                 handleMeta(meta);
                 // Show session info inline
-                if (["session", "info"].includes(meta)) {
+                if (SESSION_INFO_META.has(meta)) {
                   // We can't easily display text inline here without a state update
                   // The session info will be visible in the log file
                 }
@@ -503,6 +576,7 @@ export function App({
           <CommandReview
             suggested={phaseState.suggestion}
             safetyDecision={phaseState.safetyDecision}
+            assess={assessCommand}
             safetyDisabled={safetyDisabled}
             priorStats={priorStats}
             planStep={activeStep}
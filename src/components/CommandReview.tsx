@@ -3,133 +3,124 @@
  * Replaces render_command_review() + prompt_for_action() + review_command_flow().
  */
 
-import React, { useState } from "react";
+import React, { useMemo, useState } from "react";
 import { Box, Text, useInput } from "ink";
 import TextInput from "ink-text-input";
 import type { SafetyDecision } from "../lib/types.js";
 import type { PlanStepState } from "../lib/planState.js";
-import type { CommandStats } from "../lib/scoreboard.js";
+import type { CommandStatsView } from "../lib/scoreboard.js";
+import { RISK_COLORS } from "./colors.js";
 
 export type ReviewAction = "accept" | "skip";
 
 interface CommandReviewProps {
   suggested: string;
   safetyDecision: SafetyDecision;
+  assess: (command: string) => SafetyDecision;
   safetyDisabled: boolean;
-  priorStats: CommandStats | null;
+  priorStats: CommandStatsView | null;
   planStep: PlanStepState | null;
   onAction: (action: ReviewAction, command: string) => void;
 }
 
+type DiffToken = { text: string; type: "same" | "added" | "removed" };
+
 /** LCS-based word-level diff between two command strings. */
-function wordDiff(original: string, edited: string) {
+function wordDiff(original: string, edited: string): DiffToken[] {
   const origWords = original.split(/\s+/);
   const editWords = edited.split(/\s+/);
-  const m = origWords.length;
-  const n = editWords.length;
 
-  // Build LCS DP table
-  const dp: number[][] = Array.from({ length: m + 1 }, () =>
-    new Array(n + 1).fill(0)
-  );
+  // Edits usually touch a few words in the middle; the shared prefix and
+  // suffix are emitted as-is and only the rest goes through the LCS table.
+  let start = 0;
+  while (
+    start < origWords.length &&
+    start < editWords.length &&
+    origWords[start] === editWords[start]
+  ) {
+    start++;
+  }
+  let origEnd = origWords.length;
+  let editEnd = editWords.length;
+  while (
+    origEnd > start &&
+    editEnd > start &&
+    origWords[origEnd - 1] === editWords[editEnd - 1]
+  ) {
+    origEnd--;
+    editEnd--;
+  }
+
+  const a = origWords.slice(start, origEnd);
+  const b = editWords.slice(start, editEnd);
+  const m = a.length;
+  const n = b.length;
+
+  // Build LCS DP table, flattened: dp[i * w + j] is the LCS of a[i:], b[j:]
+  const w = n + 1;
+  const dp = new Int32Array((m + 1) * w);
   for (let i = m - 1; i >= 0; i--) {
     for (let j = n - 1; j >= 0; j--) {
-      if (origWords[i] === editWords[j]) {
-        dp[i]![j] = 1 + dp[i + 1]![j + 1]!;
-      } else {
-        dp[i]![j] = Math.max(dp[i + 1]![j]!, dp[i]![j + 1]!);
-      }
+      dp[i * w + j] =
+        a[i] === b[j]
+          ? 1 + dp[(i + 1) * w + j + 1]!
+          : Math.max(dp[(i + 1) * w + j]!, dp[i * w + j + 1]!);
     }
   }
 
   // Traceback to produce tokens in order
-  const tokens: Array<{ text: string; type: "same" | "added" | "removed" }> = [];
+  const tokens: DiffToken[] = [];
+  for (let k = 0; k < start; k++) tokens.push({ text: origWords[k]!, type: "same" });
   let i = 0, j = 0;
   while (i < m && j < n) {
-    if (origWords[i] === editWords[j]) {
-      tokens.push({ text: origWords[i]!, type: "same" });
+    if (a[i] === b[j]) {
+      tokens.push({ text: a[i]!, type: "same" });
       i++; j++;
-    } else if (dp[i + 1]![j]! >= dp[i]![j + 1]!) {
-      tokens.push({ text: origWords[i]!, type: "removed" });
+    } else if (dp[(i + 1) * w + j]! >= dp[i * w + j + 1]!) {
+      tokens.push({ text: a[i]!, type: "removed" });
       i++;
     } else {
-      tokens.push({ text: editWords[j]!, type: "added" });
+      tokens.push({ text: b[j]!, type: "added" });
       j++;
     }
   }
-  while (i < m) tokens.push({ text: origWords[i++]!, type: "removed" });
-  while (j < n) tokens.push({ text: editWords[j++]!, type: "added" });
+  while (i < m) tokens.push({ text: a[i++]!, type: "removed" });
+  while (j < n) tokens.push({ text: b[j++]!, type: "added" });
+  for (let k = origEnd; k < origWords.length; k++) {
+    tokens.push({ text: origWords[k]!, type: "same" });
+  }
   return tokens;
 }
 
-type Mode = "review" | "editing" | "confirm";
+interface ReviewDetailsProps {
+  suggested: string;
+  activeCommand: string;
+  safetyDecision: SafetyDecision;
+  safetyDisabled: boolean;
+  priorStats: CommandStatsView | null;
+  planStep: PlanStepState | null;
+}
 
-export function CommandReview({
+/**
+ * Everything above the action bar. Memoized so keystrokes in the edit and
+ * confirm inputs only re-render the input line, not the diff and risk info.
+ */
+const ReviewDetails = React.memo(function ReviewDetails({
   suggested,
+  activeCommand,
   safetyDecision,
   safetyDisabled,
   priorStats,
   planStep,
-  onAction,
-}: CommandReviewProps) {
-  const [mode, setMode] = useState<Mode>("review");
-  const [editValue, setEditValue] = useState(suggested);
-  const [confirmValue, setConfirmValue] = useState("");
-  const [activeCommand, setActiveCommand] = useState(suggested);
-
-  const level = safetyDecision.level.toLowerCase();
-  const riskColor = level === "high" ? "red" : level === "medium" ? "yellow" : "green";
-
-  // Keypress handler for review mode
-  useInput(
-    (input, key) => {
-      if (mode !== "review") return;
-      const k = input.toLowerCase();
-      if (k === "a" || key.return) {
-        // Accept — require explicit confirmation when safety is on and either
-        // the level is high OR the policy explicitly set requireConfirmation.
-        if (
-          !safetyDisabled &&
-          (level === "high" || safetyDecision.requireConfirmation)
-        ) {
-          setConfirmValue("");
-          setMode("confirm");
-        } else {
-          onAction("accept", activeCommand);
-        }
-      } else if (k === "e") {
-        setEditValue(activeCommand);
-        setMode("editing");
-      } else if (k === "s") {
-        onAction("skip", activeCommand);
-      }
-    },
-    { isActive: mode === "review" }
+}: ReviewDetailsProps) {
+  const riskColor = RISK_COLORS[safetyDecision.level.toLowerCase()] ?? "green";
+  const diffTokens = useMemo(
+    () => (activeCommand !== suggested ? wordDiff(suggested, activeCommand) : null),
+    [suggested, activeCommand]
   );
 
-  const handleEditSubmit = (val: string) => {
-    const trimmed = val.trim();
-    if (!trimmed) {
-      onAction("skip", suggested);
-      return;
-    }
-    setActiveCommand(trimmed);
-    setMode("review");
-  };
-
-  const handleConfirmSubmit = (val: string) => {
-    if (val.trim().toLowerCase() === "proceed") {
-      onAction("accept", activeCommand);
-    } else {
-      setConfirmValue("");
-    }
-  };
-
-  const diffTokens =
-    activeCommand !== suggested ? wordDiff(suggested, activeCommand) : null;
-
   return (
-    <Box flexDirection="column" marginY={1}>
+    <>
       {/* Plan step context */}
       {planStep && (
         <Box flexDirection="column">
@@ -205,6 +196,89 @@ export function CommandReview({
           )}
         </Box>
       )}
+    </>
+  );
+});
+
+type Mode = "review" | "editing" | "confirm";
+
+export function CommandReview({
+  suggested,
+  safetyDecision: suggestedDecision,
+  assess,
+  safetyDisabled,
+  priorStats,
+  planStep,
+  onAction,
+}: CommandReviewProps) {
+  const [mode, setMode] = useState<Mode>("review");
+  const [editValue, setEditValue] = useState(suggested);
+  const [confirmValue, setConfirmValue] = useState("");
+  const [activeCommand, setActiveCommand] = useState(suggested);
+
+  // Re-assess after an edit so the risk shown (and the confirmation gate)
+  // matches the command that will actually run.
+  const safetyDecision = useMemo(
+    () => (activeCommand === suggested ? suggestedDecision : assess(activeCommand)),
+    [activeCommand, suggested, suggestedDecision, assess]
+  );
+  const level = safetyDecision.level.toLowerCase();
+
+  // Keypress handler for review mode
+  useInput(
+    (input, key) => {
+      if (mode !== "review") return;
+      const k = input.toLowerCase();
+      if (k === "a" || key.return) {
+        // Accept — require explicit confirmation when safety is on and either
+        // the level is high OR the policy explicitly set requireConfirmation.
+        if (
+          !safetyDisabled &&
+          (level === "high" || safetyDecision.requireConfirmation)
+        ) {
+          setConfirmValue("");
+          setMode("confirm");
+        } else {
+          onAction("accept", activeCommand);
+        }
+      } else if (k === "e") {
+        setEditValue(activeCommand);
+        setMode("editing");
+      } else if (k === "s") {
+        onAction("skip", activeCommand);
+      }
+    },
+    { isActive: mode === "review" }
+  );
+
+  const handleEditSubmit = (val: string) => {
+    const trimmed = val.trim();
+    if (!trimmed) {
+      onAction("skip", suggested);
+      return;
+    }
+    setActiveCommand(trimmed);
+    setMode("review");
+  };
+
+  const handleConfirmSubmit = (val: string) => {
+    if (val.trim().toLowerCase() === "proceed") {
+      onAction("accept", activeCommand);
+    } else {
+      setConfirmValue("");
+    }
+  };
+
+  return (
+    <Box flexDirection="column" marginY={1}>
+      <ReviewDetails
+        suggested={suggested}
+        activeCommand={activeCommand}
+        safetyDecision={safetyDecision}
+        safetyDisabled={safetyDisabled}
+        priorStats={priorStats}
+        planStep={planStep}
+      />
 
       {/* Action bar or edit input */}
       {mode === "review" && (
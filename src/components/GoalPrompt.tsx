@@ -6,6 +6,8 @@ import React, { useState } from "react";
 import { Text, Box } from "ink";
 import TextInput from "ink-text-input";
 
+const EXIT_WORDS: ReadonlySet<string> = new Set(["exit", "quit", "e", "q"]);
+
 interface GoalPromptProps {
   onGoal: (goal: string) => void;
   onExit: () => void;
@@ -20,7 +22,7 @@ export function GoalPrompt({ onGoal, onExit, onMeta }: GoalPromptProps) {
     setValue("");
     if (!trimmed) return;
 
-    if (["exit", "quit", "e", "q"].includes(trimmed.toLowerCase())) {
+    if (EXIT_WORDS.has(trimmed.toLowerCase())) {
       onExit();
       return;
     }
@@ -7,6 +7,7 @@ import React from "react";
 import { Box, Text } from "ink";
 import type { CommandResult } from "../lib/types.js";
 import { truncateCommand } from "../lib/planState.js";
+import { RISK_COLORS } from "./colors.js";
 
 interface GoalSummaryProps {
   goal: string;
@@ -30,17 +31,13 @@ export function GoalSummary({ goal, history, status }: GoalSummaryProps) {
             {" | exit "}
             <Text color={outcomeColor}>{result.returncode}</Text>
             {" | risk "}
-            <Text
-              color={
-                result.riskLevel === "high"
-                  ? "red"
-                  : result.riskLevel === "medium"
-                  ? "yellow"
-                  : "green"
-              }
-            >
-              {result.riskLevel.toUpperCase()}
-            </Text>
+            {result.safetyDisabled ? (
+              <Text color="gray">{"OFF"}</Text>
+            ) : (
+              <Text color={RISK_COLORS[result.riskLevel] ?? "green"}>
+                {result.riskLevel.toUpperCase()}
+              </Text>
+            )}
             {" | "}
             <Text color={outcomeColor}>{outcome}</Text>
           </Text>
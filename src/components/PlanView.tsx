@@ -6,13 +6,7 @@
 import React from "react";
 import { Box, Text } from "ink";
 import type { PlanState } from "../lib/planState.js";
-
-const STATUS_COLORS: Record<string, string> = {
-  pending: "white",
-  in_progress: "yellow",
-  completed: "green",
-  failed: "red",
-};
+import { STATUS_COLORS } from "./colors.js";
 
 interface PlanViewProps {
   plan: PlanState;
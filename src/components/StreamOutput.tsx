@@ -5,9 +5,28 @@
 import React from "react";
 import { Box, Text } from "ink";
 
+const TRAILING_SPACE = /[^\S\n]+$/gm;
+
+// Only the tail of a stream is worth drawing: anything further back has
+// scrolled away, and the planner gets its own compressed copy.
+const DISPLAY_CHARS = 8000;
+
+/**
+ * Strip trailing whitespace from every line and from the block as a whole,
+ * keeping at most the last DISPLAY_CHARS characters (cut at a line start).
+ */
+function cleanOutput(text: string): string {
+  if (text.length > DISPLAY_CHARS) {
+    const tail = text.slice(-DISPLAY_CHARS);
+    const lineStart = tail.indexOf("\n") + 1;
+    text = "...[earlier output hidden]...\n" + tail.slice(lineStart);
+  }
+  return text.replace(TRAILING_SPACE, "").trimEnd();
+}
+
 interface StreamOutputProps {
-  stdout: string[];
-  stderr: string[];
+  stdout: string;
+  stderr: string;
   command: string;
   exitCode: number | null;
   running: boolean;
@@ -20,19 +39,15 @@ export function StreamOutput({
   exitCode,
   running,
 }: StreamOutputProps) {
+  const out = cleanOutput(stdout);
+  const err = cleanOutput(stderr);
   return (
     <Box flexDirection="column">
       <Text color="cyan">{"Executing: "}<Text color="white">{command}</Text></Text>
-      {stdout.map((line, i) => (
-        <Text key={`out-${i}`} color="green">
-          {line.trimEnd()}
-        </Text>
-      ))}
-      {stderr.map((line, i) => (
-        <Text key={`err-${i}`} color="red">
-          {line.trimEnd()}
-        </Text>
-      ))}
+      {/* One styled block per stream: Ink lays out and diffs a single node
+          instead of one per output line. */}
+      {out && <Text color="green">{out}</Text>}
+      {err && <Text color="red">{err}</Text>}
       {!running && exitCode !== null && (
         <Text color="magenta">{`Exit code: ${exitCode}`}</Text>
       )}
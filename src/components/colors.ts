@@ -0,0 +1,16 @@
+/**
+ * Colour lookups shared by the Ink components.
+ */
+
+export const STATUS_COLORS: Readonly<Record<string, string>> = {
+  pending: "white",
+  in_progress: "yellow",
+  completed: "green",
+  failed: "red",
+};
+
+export const RISK_COLORS: Readonly<Record<string, string>> = {
+  low: "green",
+  medium: "yellow",
+  high: "red",
+};
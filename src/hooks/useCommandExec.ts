@@ -5,70 +5,152 @@
 import { useState, useRef, useCallback } from "react";
 import { spawn } from "child_process";
 
+// Characters that need the shell: quoting, expansion, globbing, redirection,
+// pipes, chaining, grouping, comments. Commands free of these are split on
+// whitespace and exec'd directly, which skips forking /bin/sh.
+const SHELL_SYNTAX = /[|&;<>()$`\\"'*?[\]{}~#!\n]/;
+
+// Builtins only exist inside a shell (there is no /usr/bin/cd).
+const SHELL_BUILTINS = new Set([
+  ".", ":", "alias", "bg", "break", "builtin", "cd", "command", "continue",
+  "declare", "dirs", "disown", "eval", "exec", "exit", "export", "fg",
+  "getopts", "hash", "history", "jobs", "let", "local", "popd", "pushd",
+  "read", "readonly", "return", "set", "shift", "shopt", "source", "times",
+  "trap", "type", "typeset", "ulimit", "umask", "unalias", "unset", "wait",
+]);
+
+/** Split a command into argv when it can run without a shell, else null. */
+function directArgv(command: string): string[] | null {
+  if (SHELL_SYNTAX.test(command)) return null;
+  // The shell only splits words on blanks; other whitespace stays in the word.
+  const argv = command.replace(/^[ \t]+|[ \t]+$/g, "").split(/[ \t]+/);
+  const program = argv[0];
+  // "VAR=value cmd" is an environment assignment, not a program name.
+  if (!program || program.includes("=") || SHELL_BUILTINS.has(program)) return null;
+  return argv;
+}
+
+// Captured output is bounded so a runaway command can't exhaust memory. The
+// head and a generous tail survive, which is everything compressOutput and
+// the display ever look at; the middle is dropped in batches of
+// CAPTURE_SLACK characters so trimming stays amortized O(1) per byte.
+const CAPTURE_HEAD = 16 * 1024;
+const CAPTURE_TAIL = 64 * 1024;
+const CAPTURE_SLACK = 64 * 1024;
+const CAPTURE_MARKER = "\n...[output truncated]...\n";
+
+function capOutput(text: string): string {
+  if (text.length <= CAPTURE_HEAD + CAPTURE_TAIL + CAPTURE_SLACK) return text;
+  return text.slice(0, CAPTURE_HEAD) + CAPTURE_MARKER + text.slice(-CAPTURE_TAIL);
+}
+
+/** Final output of one run, as resolved by execute(). */
+export interface CommandExecResult {
+  stdout: string;
+  stderr: string;
+  exitCode: number;
+  // Epoch milliseconds; formatted by whoever records the run
+  startedAt: number;
+  durationMs: number;
+}
+
 export interface CommandExecState {
-  stdout: string[];
-  stderr: string[];
+  stdout: string;
+  stderr: string;
   exitCode: number | null;
   running: boolean;
 }
 
 export function useCommandExec() {
-  // Accumulate chunks in refs (O(1) push) to avoid O(n²) array spreading on
-  // every data event. State is synced on an interval and on close.
-  const stdoutRef = useRef<string[]>([]);
-  const stderrRef = useRef<string[]>([]);
+  // Accumulate output in refs; appending to a string is amortized O(1) and
+  // the result is handed to state without a copy. State is synced at most
+  // once per flush window while output is arriving, and on close.
+  const stdoutRef = useRef("");
+  const stderrRef = useRef("");
 
   const [state, setState] = useState<CommandExecState>({
-    stdout: [],
-    stderr: [],
+    stdout: "",
+    stderr: "",
     exitCode: null,
     running: false,
   });
 
-  const execute = useCallback((command: string) => {
-    stdoutRef.current = [];
-    stderrRef.current = [];
-    setState({ stdout: [], stderr: [], exitCode: null, running: true });
+  const execute = useCallback((command: string): Promise<CommandExecResult> => {
+    stdoutRef.current = "";
+    stderrRef.current = "";
+    setState({ stdout: "", stderr: "", exitCode: null, running: true });
+    const startedAt = Date.now();
 
-    const child = spawn(command, { shell: true });
+    let resolveRun!: (result: CommandExecResult) => void;
+    const done = new Promise<CommandExecResult>((resolve) => {
+      resolveRun = resolve;
+    });
+
+    // Only the output is piped. Nothing is ever written to the child, so it
+    // gets no stdin pipe: one fewer fd pair per run, and a command that reads
+    // stdin sees EOF instead of blocking on a pipe no one will close.
+    const stdio: ["ignore", "pipe", "pipe"] = ["ignore", "pipe", "pipe"];
+    const argv = directArgv(command);
+    const child = argv
+      ? spawn(argv[0]!, argv.slice(1), { stdio })
+      : spawn(command, { shell: true, stdio });
 
-    // Flush accumulated output to state every 100 ms for live display.
-    const flushInterval = setInterval(() => {
+    // The first chunk after a flush arms a single 100 ms timer; everything
+    // that arrives before it fires is rendered together. A quiet process
+    // keeps no timer on the event loop.
+    let flushTimer: ReturnType<typeof setTimeout> | null = null;
+    const flush = () => {
+      flushTimer = null;
       setState((prev) => ({
         ...prev,
-        stdout: [...stdoutRef.current],
-        stderr: [...stderrRef.current],
+        stdout: stdoutRef.current,
+        stderr: stderrRef.current,
       }));
-    }, 100);
-
-    child.stdout.on("data", (chunk: Buffer) => {
-      stdoutRef.current.push(chunk.toString());
-    });
+    };
+    const cancelFlush = () => {
+      if (flushTimer !== null) clearTimeout(flushTimer);
+      flushTimer = null;
+    };
+    const collect = (target: { current: string }) => (chunk: string) => {
+      target.current = capOutput(target.current + chunk);
+      flushTimer ??= setTimeout(flush, 100);
+    };
 
-    child.stderr.on("data", (chunk: Buffer) => {
-      stderrRef.current.push(chunk.toString());
-    });
+    // Let the streams decode UTF-8 natively; this also keeps multi-byte
+    // characters intact when they straddle a chunk boundary.
+    child.stdout.setEncoding("utf8");
+    child.stderr.setEncoding("utf8");
+    child.stdout.on("data", collect(stdoutRef));
+    child.stderr.on("data", collect(stderrRef));
 
-    child.on("close", (code) => {
-      clearInterval(flushInterval);
-      setState({
-        stdout: [...stdoutRef.current],
-        stderr: [...stderrRef.current],
-        exitCode: code ?? 1,
-        running: false,
+    // close and error can both fire for one child (a failed spawn emits
+    // error, then close with a negative errno); the first one settles the run.
+    let settled = false;
+    const settle = (exitCode: number) => {
+      if (settled) return;
+      settled = true;
+      cancelFlush();
+      const stdout = stdoutRef.current;
+      const stderr = stderrRef.current;
+      setState({ stdout, stderr, exitCode, running: false });
+      resolveRun({
+        stdout,
+        stderr,
+        exitCode,
+        startedAt,
+        durationMs: Date.now() - startedAt,
       });
-    });
+    };
 
-    child.on("error", (err) => {
-      clearInterval(flushInterval);
-      stderrRef.current.push(`Process error: ${err.message}\n`);
-      setState({
-        stdout: [...stdoutRef.current],
-        stderr: [...stderrRef.current],
-        exitCode: 1,
-        running: false,
-      });
+    child.on("close", (code) => settle(code ?? 1));
+    child.on("error", (err: NodeJS.ErrnoException) => {
+      if (settled) return;
+      stderrRef.current += `Process error: ${err.message}\n`;
+      // Match the shell's "command not found" status for direct spawns.
+      settle(err.code === "ENOENT" ? 127 : 1);
     });
+
+    return done;
   }, []);
 
   return { ...state, execute };
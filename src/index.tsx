@@ -14,6 +14,7 @@ import { TelemetryEmitterImpl } from "./lib/telemetry.js";
 import { SessionManagerImpl } from "./lib/session.js";
 import { SafetyPolicy } from "./lib/safety.js";
 import { createPlanner, PlannerError } from "./lib/planner.js";
+import type { PlannerOptions } from "./lib/planner.js";
 import { Logger } from "./lib/logger.js";
 import { App } from "./App.js";
 
@@ -37,11 +38,59 @@ interface ParsedArgs {
   allowRoot?: boolean;
   safetyOff?: boolean;
   safetyPolicy?: string;
+  autoAcceptLowRisk?: boolean;
   logFile?: string;
   telemetryFile?: string;
   help?: boolean;
 }
 
+type StringArg = {
+  [K in keyof ParsedArgs]-?: ParsedArgs[K] extends string | undefined ? K : never;
+}[keyof ParsedArgs];
+type BooleanArg = {
+  [K in keyof ParsedArgs]-?: ParsedArgs[K] extends boolean | undefined ? K : never;
+}[keyof ParsedArgs];
+
+// Flags that take a string value, keyed by flag name.
+const STRING_FLAGS = new Map<string, StringArg>([
+  ["--planner", "planner"],
+  ["--planner-model", "plannerModel"],
+  ["--planner-version", "plannerVersion"],
+  ["--planner-api-key", "plannerApiKey"],
+  ["--planner-referer", "plannerReferer"],
+  ["--planner-title", "plannerTitle"],
+  ["--planner-base-url", "plannerBaseUrl"],
+  ["--config", "config"],
+  ["--session-id", "sessionId"],
+  ["--session-dir", "sessionDir"],
+  ["--safety-policy", "safetyPolicy"],
+  ["--log-file", "logFile"],
+  ["--telemetry-file", "telemetryFile"],
+]);
+
+// Switches, keyed by flag name, with the value they set.
+const BOOLEAN_FLAGS = new Map<string, [BooleanArg, boolean]>([
+  ["--help", ["help", true]],
+  ["-h", ["help", true]],
+  ["--no-persist", ["noPersist", true]],
+  ["--persist", ["noPersist", false]],
+  ["--allow-root", ["allowRoot", true]],
+  ["--safety-off", ["safetyOff", true]],
+  ["--auto-accept-low-risk", ["autoAcceptLowRisk", true]],
+]);
+
+// Planner constructor options and the CLI argument that overrides each one.
+// Values fall back to the matching `config.planner` field.
+const PLANNER_OPTION_ARGS: ReadonlyArray<[keyof PlannerOptions, keyof ParsedArgs]> = [
+  ["model", "plannerModel"],
+  ["timeout", "plannerTimeout"],
+  ["apiKey", "plannerApiKey"],
+  ["referer", "plannerReferer"],
+  ["title", "plannerTitle"],
+  ["baseUrl", "plannerBaseUrl"],
+  ["version", "plannerVersion"],
+];
+
 function parseArgs(argv: string[]): ParsedArgs {
   const args = argv.slice(2);
   const result: ParsedArgs = {};
@@ -56,29 +105,15 @@ function parseArgs(argv: string[]): ParsedArgs {
 
   while (i < args.length) {
     const arg = args[i]!;
-    if (arg === "--help" || arg === "-h") result.help = true;
-    else if (arg === "--planner") result.planner = next();
+    const stringArg = STRING_FLAGS.get(arg);
+    const booleanArg = BOOLEAN_FLAGS.get(arg);
+    if (stringArg) result[stringArg] = next();
+    else if (booleanArg) result[booleanArg[0]] = booleanArg[1];
     else if (arg === "--planner-timeout") {
       const val = next();
       const parsed = val !== undefined ? Number(val) : NaN;
       if (!isNaN(parsed)) result.plannerTimeout = parsed;
     }
-    else if (arg === "--planner-model") result.plannerModel = next();
-    else if (arg === "--planner-version") result.plannerVersion = next();
-    else if (arg === "--planner-api-key") result.plannerApiKey = next();
-    else if (arg === "--planner-referer") result.plannerReferer = next();
-    else if (arg === "--planner-title") result.plannerTitle = next();
-    else if (arg === "--planner-base-url") result.plannerBaseUrl = next();
-    else if (arg === "--config") result.config = next();
-    else if (arg === "--session-id") result.sessionId = next();
-    else if (arg === "--session-dir") result.sessionDir = next();
-    else if (arg === "--no-persist") result.noPersist = true;
-    else if (arg === "--persist") result.noPersist = false;
-    else if (arg === "--allow-root") result.allowRoot = true;
-    else if (arg === "--safety-off") result.safetyOff = true;
-    else if (arg === "--safety-policy") result.safetyPolicy = next();
-    else if (arg === "--log-file") result.logFile = next();
-    else if (arg === "--telemetry-file") result.telemetryFile = next();
     i++;
   }
   return result;
@@ -104,6 +139,7 @@ Options:
   --allow-root              Allow running as root
   --safety-off              Disable safety checks
   --safety-policy <path>    Path to safety policy file
+  --auto-accept-low-risk    Run low-risk suggestions without the review prompt
   --log-file <path>         Path to log file
   --telemetry-file <path>   Path to telemetry JSONL file (empty to disable)
   -h, --help                Show this help
@@ -138,8 +174,16 @@ function ensureNotRoot(allowRoot: boolean) {
 // ---------------------------------------------------------------------------
 
 async function main() {
-  // 1. Load .env
+  // 1. Load .env, then snapshot the AGENT_* switches read below. Each
+  // process.env access is a getenv() round-trip, so read them once.
   loadEnvironment();
+  const {
+    AGENT_ALLOW_ROOT,
+    AGENT_DISABLE_SAFETY,
+    AGENT_SESSION_PERSIST,
+    AGENT_TELEMETRY_FILE,
+    AGENT_LOG_FILE,
+  } = process.env;
 
   // 2. Parse CLI args
   const args = parseArgs(process.argv);
@@ -151,7 +195,7 @@ async function main() {
 
   // 3. Root check
   const allowRoot =
-    args.allowRoot === true || process.env["AGENT_ALLOW_ROOT"] === "1";
+    args.allowRoot === true || AGENT_ALLOW_ROOT === "1";
   ensureNotRoot(allowRoot);
 
   // 4. Load config (CLI flags override config file)
@@ -160,36 +204,34 @@ async function main() {
   // 5. Resolve final settings (flags > config > env > defaults)
   const plannerName =
     args.planner ?? config.planner.backend ?? "openrouter";
-  const plannerModel = args.plannerModel ?? config.planner.model ?? undefined;
-  const plannerTimeout =
-    args.plannerTimeout ?? config.planner.timeout ?? undefined;
-  const plannerApiKey = args.plannerApiKey ?? config.planner.apiKey ?? undefined;
-  const plannerReferer =
-    args.plannerReferer ?? config.planner.referer ?? undefined;
-  const plannerTitle = args.plannerTitle ?? config.planner.title ?? undefined;
-  const plannerBaseUrl =
-    args.plannerBaseUrl ?? config.planner.baseUrl ?? undefined;
-  const plannerVersion =
-    args.plannerVersion ?? config.planner.version ?? undefined;
+  const plannerOptions: Record<string, unknown> = {};
+  for (const [option, argKey] of PLANNER_OPTION_ARGS) {
+    const value = args[argKey] ?? config.planner[option];
+    if (value !== null && value !== undefined) plannerOptions[option] = value;
+  }
+  const { model: plannerModel, version: plannerVersion } =
+    plannerOptions as PlannerOptions;
 
   const safetyDisabled =
-    args.safetyOff === true || process.env["AGENT_DISABLE_SAFETY"] === "1";
+    args.safetyOff === true || AGENT_DISABLE_SAFETY === "1";
   const policyPath =
     args.safetyPolicy ?? config.safetyPolicyPath ?? undefined;
+  const autoAcceptLowRisk =
+    args.autoAcceptLowRisk === true || config.autoAcceptLowRisk;
 
   const sessionDir =
     args.sessionDir ?? config.sessionDir ?? undefined;
   const persist = !(
     args.noPersist === true ||
-    process.env["AGENT_SESSION_PERSIST"] === "0"
+    AGENT_SESSION_PERSIST === "0"
   );
   const sessionId = args.sessionId ?? undefined;
 
   const telemetryFile =
     args.telemetryFile !== undefined
       ? args.telemetryFile
-      : process.env["AGENT_TELEMETRY_FILE"] ?? undefined;
-  const logFile = args.logFile ?? process.env["AGENT_LOG_FILE"] ?? undefined;
+      : AGENT_TELEMETRY_FILE ?? undefined;
+  const logFile = args.logFile ?? AGENT_LOG_FILE ?? undefined;
 
   // 6. Initialize subsystems
   const logger = Logger.initialize(logFile);
@@ -204,15 +246,7 @@ async function main() {
   // 7. Create planner
   let plannerInstance;
   try {
-    plannerInstance = createPlanner(plannerName, {
-      model: plannerModel,
-      timeout: plannerTimeout,
-      apiKey: plannerApiKey,
-      referer: plannerReferer,
-      title: plannerTitle,
-      baseUrl: plannerBaseUrl,
-      version: plannerVersion,
-    });
+    plannerInstance = createPlanner(plannerName, plannerOptions as PlannerOptions);
   } catch (err) {
     const msg = err instanceof PlannerError ? err.message : String(err);
     console.error(`Failed to create planner: ${msg}`);
@@ -239,6 +273,7 @@ async function main() {
       logger={logger}
       plannerInfo={plannerInfo}
       safetyDisabled={safetyDisabled}
+      autoAcceptLowRisk={autoAcceptLowRisk}
     />
   );
 }
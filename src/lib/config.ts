@@ -15,51 +15,48 @@ export function loadConfig(filePath?: string): AppConfigShape {
       return defaultConfig();
     }
 
-    const data = JSON.parse(fs.readFileSync(configPath, "utf-8"));
-
-    const plannerData = data.planner || {};
-    const planner: PlannerConfig = {
-      backend: plannerData.backend || "openrouter",
-      model: plannerData.model || null,
-      timeout: plannerData.timeout || null,
-      apiKey: plannerData.api_key || null,
-      referer: plannerData.referer || null,
-      title: plannerData.title || null,
-      baseUrl: plannerData.base_url || null,
-      version: plannerData.version || null,
-    };
-
-    const sessionOpts = data.session || {};
-    const persist = sessionOpts.persist !== undefined ? sessionOpts.persist : true;
-    const sessionDir = sessionOpts.directory || null;
-
-    const safetyOpts = data.safety || {};
-    const policyPath = safetyOpts.policy || null;
-
-    return { planner, sessionDir, sessionPersist: persist, safetyPolicyPath: policyPath };
+    return parseConfig(JSON.parse(fs.readFileSync(configPath, "utf-8")));
   } catch {
     return defaultConfig();
   }
 }
 
-export function defaultConfig(): AppConfigShape {
+function parseConfig(data: any): AppConfigShape {
+  const plannerData = data.planner || {};
+  const planner: PlannerConfig = {
+    backend: plannerData.backend || "openrouter",
+    model: plannerData.model || null,
+    timeout: plannerData.timeout || null,
+    apiKey: plannerData.api_key || null,
+    referer: plannerData.referer || null,
+    title: plannerData.title || null,
+    baseUrl: plannerData.base_url || null,
+    version: plannerData.version || null,
+  };
+
+  const sessionOpts = data.session || {};
+  const persist = sessionOpts.persist !== undefined ? sessionOpts.persist : true;
+  const sessionDir = sessionOpts.directory || null;
+
+  const safetyOpts = data.safety || {};
+  const policyPath = safetyOpts.policy || null;
+  const autoAcceptLowRisk = safetyOpts.auto_accept_low_risk === true;
+
   return {
-    planner: {
-      backend: "openrouter",
-      model: "deepseek/deepseek-r1-0528-qwen3-8b:free",
-      timeout: null,
-      apiKey: null,
-      referer: null,
-      title: null,
-      baseUrl: null,
-      version: null,
-    },
-    sessionDir: null,
-    sessionPersist: true,
-    safetyPolicyPath: null,
+    planner,
+    sessionDir,
+    sessionPersist: persist,
+    safetyPolicyPath: policyPath,
+    autoAcceptLowRisk,
   };
 }
 
+export function defaultConfig(): AppConfigShape {
+  // An empty file: planner fields stay null so each backend (and its
+  // environment variables) picks its own model and endpoint.
+  return parseConfig({});
+}
+
 export const AppConfig = {
   load: loadConfig,
   default: defaultConfig,
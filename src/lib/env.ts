@@ -5,40 +5,40 @@
 import fs from "fs";
 import path from "path";
 
+// One KEY=VALUE assignment per line; comment lines never match because a key
+// cannot start with "#". Surrounding whitespace is excluded from both parts.
+const ENV_LINE = /^[ \t]*([A-Za-z_][A-Za-z0-9_.-]*)[ \t]*=[ \t]*(.*?)[ \t]*\r?$/gm;
+
 /**
  * Load variables from a .env file if present.
  * Reads from the project root (or process.cwd()).
- * Parses KEY=VALUE lines, skips comments and blanks.
- * Uses process.env[key] ??= value to not overwrite existing vars.
+ * Parses KEY=VALUE lines, skips comments and blanks; the first assignment of
+ * a key wins. Variables already set in the environment are not overwritten.
  */
 export function loadEnvironment(): void {
   const envPath = path.join(process.cwd(), ".env");
-  
-  if (!fs.existsSync(envPath)) {
-    return;
-  }
 
+  // A single read: a missing file is the common case and simply means there
+  // is nothing to load.
+  let envFileContent: string;
   try {
-    const envFileContent = fs.readFileSync(envPath, "utf-8");
-    for (const line of envFileContent.split("\n")) {
-      const stripped = line.trim();
-      if (!stripped || stripped.startsWith("#")) {
-        continue;
-      }
-      if (!stripped.includes("=")) {
-        continue;
-      }
-      const [key, value] = stripped.split("=", 2);
-      const keyStr = key.trim();
-      const valueStr = value.trim();
-      
-      // Only set if not already defined
-      if (process.env[keyStr] === undefined) {
-        process.env[keyStr] = valueStr;
-      }
-    }
+    envFileContent = fs.readFileSync(envPath, "utf-8");
   } catch (exc: any) {
-    // Non-fatal; just log to stderr via console later if needed.
-    console.warn(`Warning: failed to read .env file: ${exc.message}`);
+    if (exc.code !== "ENOENT") {
+      // Non-fatal; just log to stderr via console later if needed.
+      console.warn(`Warning: failed to read .env file: ${exc.message}`);
+    }
+    return;
+  }
+
+  // No prototype, so keys like "constructor" are ordinary entries.
+  const entries: Record<string, string> = Object.create(null);
+  for (const [, key, value] of envFileContent.matchAll(ENV_LINE)) {
+    if (!(key! in entries)) entries[key!] = value!;
+  }
+
+  // Only set what is not already defined, in one pass over the parsed keys.
+  for (const key in entries) {
+    if (process.env[key] === undefined) process.env[key] = entries[key];
   }
-}
\ No newline at end of file
+}
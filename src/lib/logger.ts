@@ -8,13 +8,37 @@ import path from "path";
 
 export type LogLevel = "INFO" | "WARNING" | "ERROR";
 
+// Bursts of log lines land in the same second; format each second once.
+let stampSecond = -1;
+let stamp = "";
+
+/** UTC timestamp with whole seconds, e.g. "2024-05-01T12:00:00Z". */
+export function utcSeconds(ms: number = Date.now()): string {
+  const second = Math.floor(ms / 1000);
+  if (second !== stampSecond) {
+    // Drop the ".mmmZ" suffix by position, not by regex.
+    stamp = new Date(second * 1000).toISOString().slice(0, 19) + "Z";
+    stampSecond = second;
+  }
+  return stamp;
+}
+
 export class Logger {
   private filePath: string;
   private enabled: boolean;
+  // Lines are queued by the caller and appended asynchronously, so logging
+  // never blocks the REPL on disk I/O.
+  private pending: string[] = [];
+  private writing = false;
+  // Batch handed to the in-flight appendFile; the exit hook cannot wait for it.
+  private inflight: string | null = null;
 
   constructor(filePath: string, enabled = true) {
     this.filePath = filePath;
     this.enabled = enabled;
+    if (enabled) {
+      process.once("exit", () => this.flushSync());
+    }
   }
 
   static initialize(logFile?: string | null): Logger {
@@ -39,10 +63,36 @@ export class Logger {
 
   private write(level: LogLevel, message: string): void {
     if (!this.enabled) return;
-    const ts = new Date().toISOString().replace(/\.\d{3}Z$/, "Z");
-    const line = `${ts} [${level}] ${message}\n`;
+    this.pending.push(`${utcSeconds()} [${level}] ${message}\n`);
+    if (!this.writing) this.flush();
+  }
+
+  private flush(): void {
+    if (this.pending.length === 0) return;
+    const data = this.pending.join("");
+    this.pending = [];
+    this.writing = true;
+    this.inflight = data;
+    fs.appendFile(this.filePath, data, "utf-8", () => {
+      // Best-effort — swallow write errors
+      this.writing = false;
+      this.inflight = null;
+      this.flush();
+    });
+  }
+
+  /**
+   * Write out anything still queued; used when the process is exiting.
+   * An append still in flight may never land once the process exits, so its
+   * batch is written again first (a duplicate beats a lost line).
+   */
+  private flushSync(): void {
+    const data = (this.inflight ?? "") + this.pending.join("");
+    this.inflight = null;
+    this.pending = [];
+    if (data === "") return;
     try {
-      fs.appendFileSync(this.filePath, line, "utf-8");
+      fs.appendFileSync(this.filePath, data, "utf-8");
     } catch {
       // Best-effort — swallow write errors
     }
@@ -11,20 +11,22 @@ import type { CommandResult, PlannerPlan, PlannerTurn } from "./types.js";
 
 export const OUTPUT_WHITELIST = new Set(["pwd", "ls", "whoami", "cat", "grep", "echo"]);
 
-/** Join lines into a bounded string. Keeps first half + last half when truncated. */
-export function compressOutput(lines: string[], maxChars = 4000): string {
-  const joined = lines.join("");
-  if (joined.length <= maxChars) return joined;
+/** Bound captured output. Keeps first half + last half when truncated. */
+export function compressOutput(text: string, maxChars = 4000): string {
+  if (text.length <= maxChars) return text;
   const half = Math.floor(maxChars / 2);
-  return joined.slice(0, half) + "\n...[truncated]...\n" + joined.slice(-half);
+  return text.slice(0, half) + "\n...[truncated]...\n" + text.slice(-half);
 }
 
+// First word of a command, without splitting the rest of it.
+const LEADING_WORD = /^\s*(\S+)/;
+
 export function isWhitelistedCommand(command: string): boolean {
   if (!command) return false;
-  const parts = command.trim().split(/\s+/);
-  if (parts.length === 0) return false;
-  const base = parts[0]!.split("/").pop() ?? "";
-  return OUTPUT_WHITELIST.has(base);
+  const first = LEADING_WORD.exec(command);
+  if (first === null) return false;
+  const word = first[1]!;
+  return OUTPUT_WHITELIST.has(word.slice(word.lastIndexOf("/") + 1));
 }
 
 export function shouldSendFullOutput(result: CommandResult): boolean {
@@ -42,8 +44,10 @@ export class PlanStepState {
   title: string | null;
   command: string | null;
   description: string | null;
-  status: string;
   historyIndices: number[];
+  private _status: string;
+  // toDict() result; dropped whenever the status changes.
+  private snapshot: Record<string, unknown> | null = null;
 
   constructor(opts: {
     id: string;
@@ -57,15 +61,37 @@ export class PlanStepState {
     this.title = opts.title ?? null;
     this.command = opts.command ?? null;
     this.description = opts.description ?? null;
-    this.status = opts.status ?? "pending";
+    this._status = opts.status ?? "pending";
     this.historyIndices = opts.historyIndices ?? [];
   }
 
+  get status(): string {
+    return this._status;
+  }
+
+  set status(value: string) {
+    this._status = value;
+    this.snapshot = null;
+  }
+
   label(): string {
     if (this.title) return this.title;
     if (this.command) return this.command;
     return `Step ${this.id}`;
   }
+
+  /** Plain-object form of the step; cached, so treat it as read-only. */
+  toDict(): Record<string, unknown> {
+    return (this.snapshot ??= {
+      id: this.id,
+      title: this.title,
+      command: this.command,
+      label: this.label(),
+      description: this.description,
+      status: this._status,
+      history: this.historyIndices.slice(),
+    });
+  }
 }
 
 // ---------------------------------------------------------------------------
@@ -75,49 +101,61 @@ export class PlanStepState {
 export class PlanState {
   summary: string | null;
   steps: PlanStepState[];
+  // Step id -> index into steps (first occurrence wins, as with a scan).
+  private byId: Map<string, number> = new Map();
+  // Every step before the cursor is completed, so currentStep() resumes
+  // from here instead of rescanning the plan each turn.
+  private cursor = 0;
+  // toDict() result, rebuilt only after a step changes.
+  private snapshot: Record<string, unknown> | null = null;
 
   constructor(summary: string | null, steps: PlanStepState[]) {
     this.summary = summary;
     this.steps = steps;
+    steps.forEach((step, index) => {
+      if (!this.byId.has(step.id)) this.byId.set(step.id, index);
+    });
   }
 
   currentStep(): PlanStepState | null {
-    for (const step of this.steps) {
+    while (this.cursor < this.steps.length) {
+      const step = this.steps[this.cursor]!;
       if (step.status !== "completed") return step;
+      this.cursor++;
     }
     return null;
   }
 
   getStep(stepId: string): PlanStepState | null {
-    return this.steps.find((s) => s.id === stepId) ?? null;
+    const index = this.byId.get(stepId);
+    return index === undefined ? null : this.steps[index]!;
   }
 
   markRunning(stepId: string): void {
     const step = this.getStep(stepId);
     if (!step || step.status === "completed") return;
     step.status = "in_progress";
+    this.snapshot = null;
   }
 
   recordResult(stepId: string, success: boolean, historyIndex: number | null): void {
-    const step = this.getStep(stepId);
-    if (!step) return;
+    const index = this.byId.get(stepId);
+    if (index === undefined) return;
+    const step = this.steps[index]!;
     if (historyIndex !== null) step.historyIndices.push(historyIndex);
+    // Assigned after the push so the step's cached snapshot is dropped too.
     step.status = success ? "completed" : "failed";
+    this.snapshot = null;
+    // A step behind the cursor that is no longer completed is current again.
+    if (!success && index < this.cursor) this.cursor = index;
   }
 
+  /** Plain-object form of the plan; cached, so treat it as read-only. */
   toDict(): Record<string, unknown> {
-    return {
+    return (this.snapshot ??= {
       summary: this.summary,
-      steps: this.steps.map((step) => ({
-        id: step.id,
-        title: step.title,
-        command: step.command,
-        label: step.label(),
-        description: step.description,
-        status: step.status,
-        history: step.historyIndices,
-      })),
-    };
+      steps: this.steps.map((step) => step.toDict()),
+    });
   }
 }
 
@@ -148,113 +186,217 @@ export function convertPlannerPlan(plan: PlannerPlan | null): PlanState | null {
 }
 
 // ---------------------------------------------------------------------------
-// buildPlannerHistory
+// Planner history (resultToTurn, PlannerHistory, withPlanProgress)
 // ---------------------------------------------------------------------------
 
-export function buildPlannerHistory(
-  results: CommandResult[],
-  plan: PlanState | null = null
-): PlannerTurn[] {
-  const turns: PlannerTurn[] = [];
-  const failureTally: Record<string, number> = {};
-
-  for (const result of results) {
-    const notes: string[] = [];
-
-    if (result.returncode !== 0) {
-      const key = result.suggestedCommand.trim();
-      failureTally[key] = (failureTally[key] ?? 0) + 1;
-      if (failureTally[key]! > 1) {
-        notes.push(`AGENT_NOTE: command has failed ${failureTally[key]} times.`);
-      }
-    }
+/** Key under which failures of a result are tallied across a goal. */
+export function failureKey(result: CommandResult): string {
+  return result.suggestedCommand.trim();
+}
 
-    if (result.riskLevel === "medium" || result.riskLevel === "high") {
-      notes.push(`AGENT_NOTE: risk_level=${result.riskLevel.toUpperCase()}`);
-    }
+/**
+ * Key identifying a failure as "the same again": same command, same plan
+ * step, same exit code and the same stderr (compared on a short sandwich).
+ */
+function repeatKey(result: CommandResult): string {
+  return [
+    result.executedCommand,
+    result.planStepId ?? "",
+    result.returncode,
+    compressOutput(result.stderr, 256),
+  ].join("\u0000");
+}
 
-    if (result.safetyNotes) {
-      notes.push(`AGENT_NOTE: safety_policy=${result.safetyNotes}`);
-    }
+/**
+ * AGENT_NOTE lines for one result, newline-separated ("" when none apply).
+ * Clean successes, the common case, return before any string is built.
+ */
+function resultNotes(
+  result: CommandResult,
+  failureCount: number,
+  repeatCount: number
+): string {
+  const failures = (result.score?.["failures"] as number | undefined) ?? 0;
+  if (
+    failureCount <= 1 &&
+    repeatCount <= 1 &&
+    result.riskLevel === "low" &&
+    !result.safetyNotes &&
+    !result.planStepId &&
+    !failures
+  ) {
+    return "";
+  }
 
-    if (result.planStepId) {
-      const statusLabel =
-        result.planStepStatus ?? (result.returncode === 0 ? "completed" : "failed");
-      notes.push(`AGENT_NOTE: plan_step=${result.planStepId} status=${statusLabel}`);
-    }
+  let notes = "";
+  if (failureCount > 1) {
+    notes += `\nAGENT_NOTE: command has failed ${failureCount} times.`;
+  }
+
+  if (repeatCount > 1) {
+    notes += `\nAGENT_NOTE: identical failure repeated ${repeatCount} times in a row; earlier attempts omitted.`;
+  }
+
+  if (result.riskLevel !== "low") {
+    notes += `\nAGENT_NOTE: risk_level=${result.riskLevel.toUpperCase()}`;
+  }
 
-    if (result.score) {
-      const successes = (result.score["successes"] as number | undefined) ?? 0;
-      const failures = (result.score["failures"] as number | undefined) ?? 0;
-      const scoreVal =
-        (result.score["score"] as number | undefined) ?? successes - failures;
-      if (failures && failures >= successes) {
-        notes.push(
-          `AGENT_NOTE: command_history=${successes} success/${failures} failure (score ${scoreVal}).`
-        );
-      }
+  if (result.safetyNotes) {
+    notes += `\nAGENT_NOTE: safety_policy=${result.safetyNotes}`;
+  }
+
+  if (result.planStepId) {
+    const statusLabel =
+      result.planStepStatus ?? (result.returncode === 0 ? "completed" : "failed");
+    notes += `\nAGENT_NOTE: plan_step=${result.planStepId} status=${statusLabel}`;
+  }
+
+  if (result.score) {
+    const successes = (result.score["successes"] as number | undefined) ?? 0;
+    const scoreVal =
+      (result.score["score"] as number | undefined) ?? successes - failures;
+    if (failures && failures >= successes) {
+      notes += `\nAGENT_NOTE: command_history=${successes} success/${failures} failure (score ${scoreVal}).`;
     }
+  }
 
-    // Synthetic plan-ack entries must always surface their stdout to the planner
-    // regardless of the output filter, otherwise the ack message is swallowed.
-    const isPlanAck = result.suggestedCommand === "__plan_acknowledged__";
-    const includeOutput = isPlanAck || shouldSendFullOutput(result);
-    let stdoutText: string;
-    let stderrText: string;
+  // Drop the leading newline.
+  return notes.slice(1);
+}
 
+/**
+ * Convert one recorded result into the turn fed back to the planner.
+ * `failureCount` is how many times this result's command has failed so far
+ * in the goal, including this result (0 for a success). `repeatCount` is how
+ * many identical failures in a row the turn stands for.
+ */
+export function resultToTurn(
+  result: CommandResult,
+  failureCount: number,
+  repeatCount = 1
+): PlannerTurn {
+  // Synthetic plan-ack entries must always surface their stdout to the planner
+  // regardless of the output filter, otherwise the ack message is swallowed.
+  const isPlanAck = result.suggestedCommand === "__plan_acknowledged__";
+  const includeOutput = isPlanAck || shouldSendFullOutput(result);
+  let stdoutText: string;
+  let stderrText: string;
+
+  if (includeOutput) {
+    stdoutText = compressOutput(result.stdout);
+    stderrText = compressOutput(result.stderr);
+  } else {
+    stdoutText = `Command exit code ${result.returncode} (output omitted).`;
+    stderrText = "";
+  }
+
+  const noteBlock = resultNotes(result, failureCount, repeatCount);
+  if (noteBlock) {
     if (includeOutput) {
-      stdoutText = compressOutput(result.stdout);
-      stderrText = compressOutput(result.stderr);
+      stderrText = stderrText ? `${stderrText}\n${noteBlock}` : noteBlock;
     } else {
-      stdoutText = `Command exit code ${result.returncode} (output omitted).`;
-      stderrText = "";
+      stdoutText = stdoutText ? `${stdoutText}\n${noteBlock}` : noteBlock;
     }
+  }
+
+  const turn: PlannerTurn = {
+    suggestedCommand: result.suggestedCommand,
+    executedCommand: result.executedCommand,
+    stdout: stdoutText,
+    stderr: stderrText,
+    exitCode: result.returncode,
+  };
+  if (repeatCount > 1) turn.repeatCount = repeatCount;
+  return turn;
+}
 
-    if (notes.length > 0) {
-      const noteBlock = notes.join("\n");
-      if (includeOutput) {
-        stderrText = stderrText ? `${stderrText}\n${noteBlock}` : noteBlock;
-      } else {
-        stdoutText = stdoutText ? `${stdoutText}\n${noteBlock}` : noteBlock;
-      }
+/**
+ * Planner turns for one goal, built incrementally as results are recorded.
+ * A failure identical to the one just before it replaces that turn instead
+ * of adding another, so retry loops don't repeat the same output in every
+ * prompt.
+ */
+export class PlannerHistory {
+  turns: PlannerTurn[] = [];
+  private failureTally: Map<string, number> = new Map();
+  private lastRepeatKey: string | null = null;
+
+  append(result: CommandResult): void {
+    if (result.returncode === 0) {
+      this.lastRepeatKey = null;
+      this.turns.push(resultToTurn(result, 0));
+      return;
     }
 
-    turns.push({
-      suggestedCommand: result.suggestedCommand,
-      executedCommand: result.executedCommand,
-      stdout: stdoutText,
-      stderr: stderrText,
-      exitCode: result.returncode,
-    });
-  }
+    const key = failureKey(result);
+    const failures = (this.failureTally.get(key) ?? 0) + 1;
+    this.failureTally.set(key, failures);
 
-  if (plan && turns.length > 0) {
-    const nextStep = plan.currentStep();
-    if (nextStep) {
-      const pendingLabel = nextStep.label();
-      const pendingNote = `AGENT_NOTE: plan_next=${nextStep.id} status=${nextStep.status} label=${pendingLabel}`;
-      const lastTurn = turns[turns.length - 1]!;
-      lastTurn.stderr = lastTurn.stderr
-        ? `${lastTurn.stderr}\n${pendingNote}`
-        : pendingNote;
+    const rKey = repeatKey(result);
+    if (rKey === this.lastRepeatKey) {
+      const previous = this.turns.pop()!;
+      this.turns.push(resultToTurn(result, failures, (previous.repeatCount ?? 1) + 1));
+    } else {
+      this.lastRepeatKey = rKey;
+      this.turns.push(resultToTurn(result, failures));
     }
   }
+}
+
+/**
+ * Return the history to send to the planner: `turns` with a note about the
+ * next pending plan step appended to the last turn. `turns` is not modified;
+ * without a pending step it is returned as-is rather than copied.
+ */
+export function withPlanProgress(
+  turns: PlannerTurn[],
+  plan: PlanState | null
+): PlannerTurn[] {
+  const nextStep = plan && turns.length > 0 ? plan.currentStep() : null;
+  if (!nextStep) return turns;
+
+  const pendingLabel = nextStep.label();
+  const pendingNote = `AGENT_NOTE: plan_next=${nextStep.id} status=${nextStep.status} label=${pendingLabel}`;
+  const history = turns.slice();
+  const lastTurn = history[history.length - 1]!;
+  history[history.length - 1] = {
+    ...lastTurn,
+    stderr: lastTurn.stderr ? `${lastTurn.stderr}\n${pendingNote}` : pendingNote,
+  };
+  return history;
+}
 
-  return turns;
+/**
+ * Rebuild the planner history for a complete list of results. The REPL keeps
+ * a PlannerHistory up to date instead; this is for callers that only have the
+ * recorded results.
+ */
+export function buildPlannerHistory(
+  results: CommandResult[],
+  plan: PlanState | null = null
+): PlannerTurn[] {
+  const history = new PlannerHistory();
+  for (const result of results) history.append(result);
+  return withPlanProgress(history.turns, plan);
 }
 
 // ---------------------------------------------------------------------------
 // serializeResult + determineStatus
 // ---------------------------------------------------------------------------
 
+// Session files keep this much of each step's stdout and stderr (head and
+// tail halves), so one noisy command doesn't dominate the file or the time
+// spent encoding it.
+const SESSION_OUTPUT_CHARS = 20 * 1024;
+
 export function serializeResult(result: CommandResult): Record<string, unknown> {
   return {
     suggested_command: result.suggestedCommand,
     executed_command: result.executedCommand,
-    stdout: result.stdout.join(""),
-    stderr: result.stderr.join(""),
+    stdout: compressOutput(result.stdout, SESSION_OUTPUT_CHARS),
+    stderr: compressOutput(result.stderr, SESSION_OUTPUT_CHARS),
     exit_code: result.returncode,
-    risk_level: result.riskLevel,
+    risk_level: result.safetyDisabled ? null : result.riskLevel,
     context: result.context,
     safety_notes: result.safetyNotes,
     normalized_command: result.normalizedCommand,
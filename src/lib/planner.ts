@@ -16,9 +16,21 @@ export class PlannerError extends Error {
 // JSON Parser
 // ---------------------------------------------------------------------------
 
+// Patterns used on every planner reply, built once at module load.
+// qwen3-style reasoning blocks emitted before the answer.
+const THINK_BLOCK = /<think>[\s\S]*?<\/think>/gi;
+// Markdown code fences, optionally tagged as json.
+const FENCED_BLOCK = /```(?:json)?\s*([\s\S]*?)```/g;
+// Leading "json" language tag left over from a fenced block.
+const JSON_TAG = /^json/i;
+// "command": value written without quotes.
+const UNQUOTED_COMMAND = /"command"\s*:\s*([^\s"}][^}\n]*)/;
+const WHITESPACE_RUN = /\s+/g;
+
 export function parsePlannerReply(content: string): PlannerSuggestion {
-  // Strip <think>...</think> blocks (qwen3 reasoning tokens)
-  const cleaned = content.replace(/<think>[\s\S]*?<\/think>/gi, "").trim();
+  // Strip <think>...</think> blocks (qwen3 reasoning tokens). Most replies
+  // have no "<" at all, and a substring check is cheaper than the regex.
+  const cleaned = (content.includes("<") ? content.replace(THINK_BLOCK, "") : content).trim();
 
   const data = parseFirstJson(cleaned);
   if (data === null) {
@@ -34,51 +46,89 @@ export function parsePlannerReply(content: string): PlannerSuggestion {
 }
 
 function parseFirstJson(cleaned: string): Record<string, unknown> | null {
-  const candidates: string[] = [];
-
-  if (cleaned.startsWith("{") && cleaned.endsWith("}")) {
-    candidates.push(cleaned);
+  // Common case: the whole reply is the JSON object.
+  const whole = cleaned.startsWith("{") && cleaned.endsWith("}");
+  if (whole) {
+    const data = parseCandidate(cleaned);
+    if (data !== null) return data;
   }
 
+  // Texts already tried, so a span seen before (e.g. a fenced block's own
+  // braces) is not parsed again.
+  const seen = new Set<string>();
+  if (whole) seen.add(cleaned);
+
   // Fenced code blocks
-  const fenceMatches = [...cleaned.matchAll(/```(?:json)?\s*([\s\S]*?)```/g)];
-  for (const m of fenceMatches) {
-    const block = m[1]!.trim();
-    if (block) candidates.push(block);
+  for (const m of cleaned.matchAll(FENCED_BLOCK)) {
+    let block = m[1]!.trim();
+    if (!block) continue;
+    if (JSON_TAG.test(block)) block = block.slice(4).trim();
+    if (seen.has(block)) continue;
+    const data = parseCandidate(block);
+    if (data !== null) return data;
+    seen.add(block);
   }
 
-  // Any {...} span
-  const braceMatches = [...cleaned.matchAll(/\{[\s\S]*?\}/g)];
-  for (const m of braceMatches) {
-    const snippet = m[0]!.trim();
-    if (!candidates.includes(snippet)) candidates.push(snippet);
+  // Any {...} span, matched by brace depth so nested objects parse whole.
+  let start = cleaned.indexOf("{");
+  while (start !== -1) {
+    let end = matchingBrace(cleaned, start);
+    if (end === -1) end = cleaned.indexOf("}", start);
+    if (end === -1) break;
+    const snippet = cleaned.slice(start, end + 1);
+    if (!seen.has(snippet)) {
+      const data = parseCandidate(snippet);
+      if (data !== null) return data;
+      seen.add(snippet);
+    }
+    start = cleaned.indexOf("{", start + 1);
   }
 
-  if (candidates.length === 0) candidates.push(cleaned);
+  return seen.size === 0 ? parseCandidate(cleaned) : null;
+}
 
-  for (let candidate of candidates) {
-    if (candidate.toLowerCase().startsWith("json")) {
-      candidate = candidate.slice(4).trim();
-    }
-    let data: unknown;
-    try {
-      data = JSON.parse(candidate);
-    } catch {
-      const repaired = repairSimpleCommandJson(candidate);
-      if (repaired === null) continue;
-      try {
-        data = JSON.parse(repaired);
-      } catch {
-        continue;
-      }
-    }
-    if (typeof data === "object" && data !== null && !Array.isArray(data)) {
-      return data as Record<string, unknown>;
-    }
+/** Parse one candidate, patching up unquoted command values if it fails. */
+function parseCandidate(text: string): Record<string, unknown> | null {
+  const data = parseObject(text);
+  if (data !== null) return data;
+  const repaired = repairSimpleCommandJson(text);
+  return repaired === null ? null : parseObject(repaired);
+}
+
+function parseObject(text: string): Record<string, unknown> | null {
+  let data: unknown;
+  try {
+    data = JSON.parse(text);
+  } catch {
+    return null;
+  }
+  if (typeof data === "object" && data !== null && !Array.isArray(data)) {
+    return data as Record<string, unknown>;
   }
   return null;
 }
 
+/** Index of the brace closing the object opened at `start`, or -1 if unbalanced. */
+function matchingBrace(text: string, start: number): number {
+  let depth = 0;
+  let inString = false;
+  for (let i = start; i < text.length; i++) {
+    const ch = text[i];
+    if (inString) {
+      if (ch === "\\") i++;
+      else if (ch === '"') inString = false;
+    } else if (ch === '"') {
+      inString = true;
+    } else if (ch === "{") {
+      depth++;
+    } else if (ch === "}") {
+      depth--;
+      if (depth === 0) return i;
+    }
+  }
+  return -1;
+}
+
 function buildSuggestionFromDict(
   data: Record<string, unknown>
 ): PlannerSuggestion | null {
@@ -87,20 +137,13 @@ function buildSuggestionFromDict(
     typeof modeRaw === "string" ? modeRaw.trim().toLowerCase() : null;
 
   if (mode === "command" || (mode === null && "command" in data)) {
-    const commandValue = data["command"];
-    if (typeof commandValue === "string" && commandValue.trim()) {
-      return { mode: "command", command: commandValue.trim() };
-    }
-    return null;
+    const command = trimmedText(data["command"]);
+    return command === null ? null : { mode: "command", command };
   }
 
   if (mode === "chat") {
-    const msgValue =
-      data["message"] ?? data["response"] ?? data["answer"];
-    if (typeof msgValue === "string" && msgValue.trim()) {
-      return { mode: "chat", message: msgValue.trim() };
-    }
-    return null;
+    const message = trimmedText(data["message"] ?? data["response"] ?? data["answer"]);
+    return message === null ? null : { mode: "chat", message };
   }
 
   if (mode === "plan" && "plan" in data) {
@@ -120,11 +163,7 @@ function buildPlanFromMapping(rawPlan: unknown): PlannerPlan | null {
   }
   const raw = rawPlan as Record<string, unknown>;
 
-  const summaryVal = raw["summary"];
-  const summary =
-    typeof summaryVal === "string" && summaryVal.trim()
-      ? summaryVal.trim()
-      : null;
+  const summary = trimmedText(raw["summary"]);
 
   const stepsVal = raw["steps"];
   if (!Array.isArray(stepsVal)) return null;
@@ -138,35 +177,11 @@ function buildPlanFromMapping(rawPlan: unknown): PlannerPlan | null {
     }
     const s = rawStep as Record<string, unknown>;
 
-    const stepIdVal = s["id"];
-    const stepId =
-      typeof stepIdVal === "string" && stepIdVal.trim()
-        ? stepIdVal.trim()
-        : String(index);
-
-    const titleVal = s["title"] ?? s["name"];
-    const title =
-      typeof titleVal === "string" && titleVal.trim()
-        ? titleVal.trim()
-        : null;
-
-    const commandVal = s["command"];
-    const command =
-      typeof commandVal === "string" && commandVal.trim()
-        ? commandVal.trim()
-        : null;
-
-    const descVal = s["description"] ?? s["detail"];
-    const description =
-      typeof descVal === "string" && descVal.trim()
-        ? descVal.trim()
-        : null;
-
-    const statusVal = s["status"];
-    const status =
-      typeof statusVal === "string" && statusVal.trim()
-        ? statusVal.trim()
-        : null;
+    const stepId = trimmedText(s["id"]) ?? String(index);
+    const title = trimmedText(s["title"] ?? s["name"]);
+    const command = trimmedText(s["command"]);
+    const description = trimmedText(s["description"] ?? s["detail"]);
+    const status = trimmedText(s["status"]);
 
     steps.push({ id: stepId, title, command, description, status });
     index++;
@@ -176,22 +191,42 @@ function buildPlanFromMapping(rawPlan: unknown): PlannerPlan | null {
   return { summary, steps };
 }
 
+/** A string field's trimmed text, or null when it is missing, not a string, or blank. */
+function trimmedText(value: unknown): string | null {
+  if (typeof value !== "string") return null;
+  const text = value.trim();
+  return text || null;
+}
+
 function repairSimpleCommandJson(fragment: string): string | null {
-  const match = fragment.match(/"command"\s*:\s*([^\s"}][^}\n]*)/);
+  const match = UNQUOTED_COMMAND.exec(fragment);
   if (!match) return null;
-  let value = match[1]!.trim().replace(/,$/, "").replace(/"$/, "");
+  let value = match[1]!.trim();
+  if (value.endsWith(",")) value = value.slice(0, -1);
+  if (value.endsWith('"')) value = value.slice(0, -1);
   if (!value) return null;
-  const repaired = fragment.replace(
-    /"command"\s*:\s*([^\s"}][^}\n]*)/,
-    `"command": "${value}"`
-  );
-  return repaired;
+  // Splice at the match instead of a second replace() scan, which would also
+  // expand "$1"-style sequences in the command as replacement patterns.
+  const end = match.index + match[0].length;
+  return fragment.slice(0, match.index) + `"command": "${value}"` + fragment.slice(end);
 }
 
+// The repeat guard normalizes every history command on each planner call;
+// the same few commands recur, so recent results are kept. The oldest entry
+// is evicted first, as in the scoreboard's cache.
+const NORMALIZED = new Map<string, string | null>();
+const NORMALIZED_SIZE = 512;
+
 export function normalizeCommandText(command: string | null | undefined): string | null {
   if (typeof command !== "string") return null;
-  const normalized = command.replace(/\s+/g, " ").trim();
-  return normalized || null;
+  let normalized = NORMALIZED.get(command);
+  if (normalized !== undefined) return normalized;
+  normalized = command.replace(WHITESPACE_RUN, " ").trim() || null;
+  if (NORMALIZED.size >= NORMALIZED_SIZE) {
+    NORMALIZED.delete(NORMALIZED.keys().next().value!);
+  }
+  NORMALIZED.set(command, normalized);
+  return normalized;
 }
 
 // ---------------------------------------------------------------------------
@@ -209,10 +244,10 @@ export function isRepeatedFailure(
   let failCount = 0;
   for (const turn of history) {
     if (
-      normalizeCommandText(turn.executedCommand) === norm &&
-      turn.exitCode !== 0
+      turn.exitCode !== 0 &&
+      normalizeCommandText(turn.executedCommand) === norm
     ) {
-      failCount++;
+      failCount += turn.repeatCount ?? 1;
     }
   }
   return failCount >= 2;
@@ -226,15 +261,18 @@ export function buildRepeatFeedback(history: PlannerTurn[]): {
   const last = history[history.length - 1]!;
   const norm = normalizeCommandText(last.executedCommand) ?? last.executedCommand;
 
-  // Collect the two most recent failures for this specific command
+  // Collect the two most recent failures for this specific command; a folded
+  // turn counts once per repeat.
   const failures: PlannerTurn[] = [];
   for (let i = history.length - 1; i >= 0 && failures.length < 2; i--) {
     const turn = history[i]!;
     if (
-      (normalizeCommandText(turn.executedCommand) ?? turn.executedCommand) === norm &&
-      turn.exitCode !== 0
+      turn.exitCode !== 0 &&
+      (normalizeCommandText(turn.executedCommand) ?? turn.executedCommand) === norm
     ) {
-      failures.unshift(turn);
+      for (let n = turn.repeatCount ?? 1; n > 0 && failures.length < 2; n--) {
+        failures.unshift(turn);
+      }
     }
   }
 
@@ -307,6 +345,9 @@ const SYSTEM_PROMPT =
   "Your task is to plan and execute toward the goal step-by-step until completion. " +
   "Be precise, structured, and consistent — your responses drive a live terminal automation system.";
 
+// Shared by every request, so its encoded JSON is cached once (encodeMessages).
+const SYSTEM_MESSAGE = { role: "system", content: SYSTEM_PROMPT };
+
 export interface PlannerOptions {
   model?: string;
   timeout?: number;
@@ -325,6 +366,7 @@ export class OpenRouterPlanner extends CommandPlanner {
   protected referer: string | null;
   protected title: string | null;
   protected version: string | null;
+  private headers: Record<string, string> | null = null;
 
   constructor(opts: PlannerOptions = {}) {
     super();
@@ -353,9 +395,8 @@ export class OpenRouterPlanner extends CommandPlanner {
     let messages = [...baseMessages];
 
     for (let attempt = 0; attempt < 2; attempt++) {
-      const payload = await this._chat(messages);
-      const content = this._extractContent(payload);
-      const suggestion = parsePlannerReply(content);
+      const payload = await this._chat(encodeMessages(messages));
+      const suggestion = parsePlannerReply(this._extractContent(payload));
 
       if (suggestion.mode !== "command") return suggestion;
       if (!isRepeatedFailure(suggestion.command, history)) return suggestion;
@@ -374,22 +415,20 @@ export class OpenRouterPlanner extends CommandPlanner {
     throw new PlannerError("Planner could not provide a non-repeated command");
   }
 
-  protected async _chat(messages: object[]): Promise<Record<string, unknown>> {
-    const headers: Record<string, string> = {
-      Authorization: `Bearer ${this.apiKey}`,
-      "Content-Type": "application/json",
-    };
-    if (this.referer) headers["HTTP-Referer"] = this.referer;
-    if (this.title) headers["X-Title"] = this.title;
-
-    const body = { model: this.model, messages };
+  /** POST an already JSON-encoded messages array to the completions endpoint. */
+  protected async _chat(messages: string): Promise<Record<string, unknown>> {
+    const body = `{"model":${JSON.stringify(this.model)},"messages":${messages}}`;
 
+    // fetch shares one keep-alive connection pool per origin across calls, so
+    // consecutive turns reuse the socket once the body has been read. The
+    // Ollama override usually does not: it cancels its stream once a complete
+    // reply has been parsed, before the body ends, which drops the connection.
     let response: Response;
     try {
       response = await fetch(this.baseUrl, {
         method: "POST",
-        headers,
-        body: JSON.stringify(body),
+        headers: this._requestHeaders(),
+        body,
         signal: AbortSignal.timeout(this.timeout * 1000),
       });
     } catch (err) {
@@ -403,16 +442,38 @@ export class OpenRouterPlanner extends CommandPlanner {
       );
     }
 
-    let data: unknown;
+    // Read the body once as text: a parse failure can then say what came back.
+    let text: string;
     try {
-      data = await response.json();
+      text = await response.text();
     } catch (err) {
-      throw new PlannerError(`Invalid JSON response from OpenRouter`);
+      throw new PlannerError(`Failed to read OpenRouter response: ${err}`);
+    }
+    let data: unknown;
+    try {
+      data = JSON.parse(text);
+    } catch {
+      throw new PlannerError(`Invalid JSON response from OpenRouter: ${text.slice(0, 200)}`);
     }
 
     return data as Record<string, unknown>;
   }
 
+  /**
+   * Headers sent with every request. They don't change after construction, so
+   * they are built on first use (after any subclass constructor has run).
+   */
+  protected _requestHeaders(): Record<string, string> {
+    if (this.headers === null) {
+      const headers: Record<string, string> = { "Content-Type": "application/json" };
+      if (this.apiKey) headers["Authorization"] = `Bearer ${this.apiKey}`;
+      if (this.referer) headers["HTTP-Referer"] = this.referer;
+      if (this.title) headers["X-Title"] = this.title;
+      this.headers = headers;
+    }
+    return this.headers;
+  }
+
   protected _extractContent(payload: Record<string, unknown>): string {
     if ("error" in payload) {
       throw new PlannerError(`OpenRouter error: ${JSON.stringify(payload["error"])}`);
@@ -437,22 +498,10 @@ export class OpenRouterPlanner extends CommandPlanner {
   }
 
   protected _buildMessages(goal: string, history: PlannerTurn[]): object[] {
-    const messages: object[] = [{ role: "system", content: SYSTEM_PROMPT }];
+    const messages: object[] = [SYSTEM_MESSAGE];
 
     for (const turn of history) {
-      messages.push({
-        role: "assistant",
-        content: JSON.stringify({ command: turn.suggestedCommand }),
-      });
-      messages.push({
-        role: "user",
-        content: JSON.stringify({
-          executed_command: turn.executedCommand,
-          stdout: turn.stdout,
-          stderr: turn.stderr,
-          exit_code: turn.exitCode,
-        }),
-      });
+      messages.push(...turnMessages(turn));
     }
 
     messages.push({ role: "user", content: goal });
@@ -470,6 +519,52 @@ export class OpenRouterPlanner extends CommandPlanner {
   }
 }
 
+// The REPL hands the same turn objects to every planning round of a goal, so
+// each turn's message pair is encoded once and reused until the goal ends.
+const TURN_MESSAGES = new WeakMap<PlannerTurn, [object, object]>();
+
+function turnMessages(turn: PlannerTurn): [object, object] {
+  let pair = TURN_MESSAGES.get(turn);
+  if (pair === undefined) {
+    pair = [
+      {
+        role: "assistant",
+        content: JSON.stringify({ command: turn.suggestedCommand }),
+      },
+      {
+        role: "user",
+        content: JSON.stringify({
+          executed_command: turn.executedCommand,
+          stdout: turn.stdout,
+          stderr: turn.stderr,
+          exit_code: turn.exitCode,
+        }),
+      },
+    ];
+    TURN_MESSAGES.set(turn, pair);
+  }
+  return pair;
+}
+
+// Encoded JSON of each message object. History turns keep their message
+// objects for the whole goal, so their (possibly large) output is escaped
+// once instead of on every planner call. Same text as JSON.stringify(messages).
+const MESSAGE_JSON = new WeakMap<object, string>();
+
+function encodeMessages(messages: object[]): string {
+  let encoded = "[";
+  for (let i = 0; i < messages.length; i++) {
+    const message = messages[i]!;
+    let json = MESSAGE_JSON.get(message);
+    if (json === undefined) {
+      json = JSON.stringify(message);
+      MESSAGE_JSON.set(message, json);
+    }
+    encoded += i === 0 ? json : "," + json;
+  }
+  return encoded + "]";
+}
+
 // ---------------------------------------------------------------------------
 // Ollama Planner
 // ---------------------------------------------------------------------------
@@ -501,19 +596,15 @@ export class OllamaPlanner extends OpenRouterPlanner {
     this.version = opts.version ?? process.env["AGENT_PLANNER_VERSION"] ?? null;
   }
 
-  protected async _chat(messages: object[]): Promise<Record<string, unknown>> {
-    const headers: Record<string, string> = { "Content-Type": "application/json" };
-    if (this.referer) headers["HTTP-Referer"] = this.referer;
-    if (this.title) headers["X-Title"] = this.title;
-
-    const body = { model: this.model, messages };
+  protected async _chat(messages: string): Promise<Record<string, unknown>> {
+    const body = `{"model":${JSON.stringify(this.model)},"messages":${messages},"stream":true}`;
 
     let response: Response;
     try {
       response = await fetch(this.baseUrl, {
         method: "POST",
-        headers,
-        body: JSON.stringify(body),
+        headers: this._requestHeaders(),
+        body,
         signal: AbortSignal.timeout(this.timeout * 1000),
       });
     } catch (err) {
@@ -524,14 +615,19 @@ export class OllamaPlanner extends OpenRouterPlanner {
       const text = await response.text();
       throw new PlannerError(`Ollama returned status ${response.status}: ${text}`);
     }
+    if (response.body === null) {
+      throw new PlannerError("Ollama returned an empty response");
+    }
 
-    let data: unknown;
+    let content: string;
     try {
-      data = await response.json();
-    } catch {
-      throw new PlannerError("Invalid JSON from Ollama");
+      content = await readStreamedContent(response.body);
+    } catch (err) {
+      if (err instanceof PlannerError) throw err;
+      throw new PlannerError(`Failed to read Ollama stream: ${err}`);
     }
-    return data as Record<string, unknown>;
+    // Same shape as a non-streamed completion so _extractContent applies.
+    return { choices: [{ message: { content } }] };
   }
 
   protected _extractContent(payload: Record<string, unknown>): string {
@@ -561,6 +657,145 @@ export class OllamaPlanner extends OpenRouterPlanner {
   }
 }
 
+// Next "{" or "<think>" outside an object; closing tag inside a think block.
+const OBJECT_OR_THINK = /\{|<think>/gi;
+const THINK_CLOSE = /<\/think>/gi;
+
+/**
+ * Watches a streamed reply for the first complete JSON object outside any
+ * <think> block. Each call to feed() only scans the text added since the
+ * previous call, so a long stream is scanned once rather than per chunk.
+ *
+ * The reply may only be cut where parsing the rest could not change the
+ * result: the object must be the one parseFirstJson would settle on and a
+ * usable suggestion, and no code fence may have started (fenced blocks take
+ * precedence over bare objects). Otherwise the whole stream is read.
+ */
+class ReplyScanner {
+  private settled = false;
+  private pos = 0;
+  private inThink = false;
+  private start = -1;
+  private depth = 0;
+  private inString = false;
+
+  /** Scan `text` (the whole reply so far); true once the rest can be dropped. */
+  feed(text: string): boolean {
+    while (!this.settled && this.pos < text.length) {
+      if (this.inThink) {
+        THINK_CLOSE.lastIndex = this.pos;
+        const close = THINK_CLOSE.exec(text);
+        if (close === null) {
+          this.pos = Math.max(this.pos, text.length - 7);
+          return false;
+        }
+        this.inThink = false;
+        this.pos = THINK_CLOSE.lastIndex;
+        continue;
+      }
+
+      if (this.depth === 0) {
+        OBJECT_OR_THINK.lastIndex = this.pos;
+        const open = OBJECT_OR_THINK.exec(text);
+        if (open === null) {
+          // Keep a possible partial "<think" at the tail for the next chunk.
+          this.pos = Math.max(this.pos, text.length - 6);
+          return false;
+        }
+        this.pos = OBJECT_OR_THINK.lastIndex;
+        if (open[0] !== "{") {
+          this.inThink = true;
+          continue;
+        }
+        this.start = open.index;
+        this.depth = 1;
+        this.inString = false;
+      }
+
+      let i = this.pos;
+      for (; i < text.length && this.depth > 0; i++) {
+        const ch = text[i];
+        if (this.inString) {
+          if (ch === "\\") i++;
+          else if (ch === '"') this.inString = false;
+        } else if (ch === '"') {
+          this.inString = true;
+        } else if (ch === "{") {
+          this.depth++;
+        } else if (ch === "}") {
+          this.depth--;
+        }
+      }
+      if (this.depth > 0) {
+        this.pos = i;
+        return false;
+      }
+      const data = parseCandidate(text.slice(this.start, i));
+      if (data !== null) {
+        // Fences aside, parseFirstJson settles on this object as well. If it
+        // is not a usable suggestion, only the full reply can decide.
+        this.settled = true;
+        return !text.includes("```") && buildSuggestionFromDict(data) !== null;
+      }
+      // Not valid JSON on its own; look for an object nested inside it.
+      this.pos = this.start + 1;
+    }
+    return false;
+  }
+}
+
+/**
+ * Collect the content deltas of an OpenAI-style event stream. Reading stops
+ * as soon as the reply holds a complete suggestion (see ReplyScanner);
+ * cancelling the stream drops the connection, which makes Ollama stop
+ * generating the tokens the parser would discard anyway.
+ */
+async function readStreamedContent(stream: ReadableStream<Uint8Array>): Promise<string> {
+  const reader = stream.getReader();
+  const decoder = new TextDecoder();
+  const scanner = new ReplyScanner();
+  let buffered = "";
+  let content = "";
+  try {
+    for (;;) {
+      const { done, value } = await reader.read();
+      if (done) return content;
+      buffered += decoder.decode(value, { stream: true });
+      const lines = buffered.split("\n");
+      buffered = lines.pop()!;
+
+      let grew = false;
+      for (const line of lines) {
+        const trimmed = line.trim();
+        if (!trimmed.startsWith("data:")) continue;
+        const data = trimmed.slice(5).trim();
+        if (data === "[DONE]") return content;
+        let chunk: Record<string, unknown>;
+        try {
+          chunk = JSON.parse(data) as Record<string, unknown>;
+        } catch {
+          continue;
+        }
+        if ("error" in chunk) {
+          throw new PlannerError(`Ollama error: ${JSON.stringify(chunk["error"])}`);
+        }
+        const choices = chunk["choices"];
+        const first = Array.isArray(choices)
+          ? (choices[0] as { delta?: { content?: unknown } } | undefined)
+          : undefined;
+        const delta = first?.delta?.content;
+        if (typeof delta === "string" && delta) {
+          content += delta;
+          grew = true;
+        }
+      }
+      if (grew && scanner.feed(content)) return content;
+    }
+  } finally {
+    reader.cancel().catch(() => {});
+  }
+}
+
 // ---------------------------------------------------------------------------
 // Planner Factory
 // ---------------------------------------------------------------------------
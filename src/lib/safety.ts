@@ -6,7 +6,13 @@
 import fs from "fs";
 import path from "path";
 import os from "os";
-import { SafetyDecision, SafetyRule as SafetyRuleInterface } from "./types.js";
+import { RiskLevel, SafetyDecision, SafetyRule as SafetyRuleInterface } from "./types.js";
+
+const RISK_LEVELS: ReadonlySet<string> = new Set<RiskLevel>(["low", "medium", "high"]);
+
+// Shared result for commands no rule objects to; callers treat decisions as
+// read-only, so there is no need to allocate one per evaluation.
+const LOW_RISK: SafetyDecision = { level: "low", requireConfirmation: false };
 
 function expandHome(p: string): string {
   if (p === "~" || p.startsWith("~/")) {
@@ -17,15 +23,21 @@ function expandHome(p: string): string {
 
 export class SafetyRule {
   pattern: string;
-  level: string;
+  level: RiskLevel;
   requireConfirmation: boolean;
   allowedFlags: string[] | null;
   description: string | null;
   private regex: RegExp;
+  // Any one of allowedFlags, as a single literal alternation.
+  private flagRegex: RegExp | null;
+  // A rule's decision only depends on whether an allowed flag is present, so
+  // both outcomes are built once and shared; decisions are read-only.
+  private decision: SafetyDecision;
+  private missingFlagDecision: SafetyDecision | null;
 
   constructor(opts: {
     pattern: string;
-    level: string;
+    level: RiskLevel;
     requireConfirmation?: boolean;
     allowedFlags?: string[] | null;
     description?: string | null;
@@ -36,6 +48,11 @@ export class SafetyRule {
     this.allowedFlags = opts.allowedFlags ?? null;
     this.description = opts.description ?? null;
     this.regex = new RegExp(opts.pattern, "i");
+    this.flagRegex = this.allowedFlags
+      ? new RegExp(this.allowedFlags.map(escapeRegExp).join("|"))
+      : null;
+    this.decision = this._buildDecision(false);
+    this.missingFlagDecision = this.allowedFlags ? this._buildDecision(true) : null;
   }
 
   matches(command: string): boolean {
@@ -43,16 +60,21 @@ export class SafetyRule {
   }
 
   evaluate(command: string): SafetyDecision {
+    if (this.missingFlagDecision && !this.flagRegex!.test(command)) {
+      return this.missingFlagDecision;
+    }
+    return this.decision;
+  }
+
+  private _buildDecision(missingFlag: boolean): SafetyDecision {
     const notes: string[] = [];
     let requireConfirmation = this.requireConfirmation;
 
-    if (this.allowedFlags) {
-      if (!this.allowedFlags.some((flag) => command.includes(flag))) {
-        notes.push(
-          "Expected one of the following flags: " + this.allowedFlags.join(", ")
-        );
-        requireConfirmation = true;
-      }
+    if (missingFlag && this.allowedFlags) {
+      notes.push(
+        "Expected one of the following flags: " + this.allowedFlags.join(", ")
+      );
+      requireConfirmation = true;
     }
 
     if (this.description) {
@@ -69,9 +91,58 @@ export class SafetyRule {
 
 export class SafetyPolicy {
   private rules: SafetyRule[];
+  // Union of every rule pattern, so commands that match no rule at all (the
+  // common case) are classified with a single regex scan. Each alternative is
+  // a named group, which tells us which rule fired at the leftmost match.
+  private combined: RegExp | null;
+  // Literal text at least one rule needs in order to match (lower-cased).
+  // A command containing none of it is low risk without running any regex.
+  // Null when some rule's pattern doesn't start with readable literal text.
+  private anchors: string[] | null;
+  // Planners often re-suggest the same command; remember recent decisions.
+  // Map iteration order doubles as LRU order.
+  private cache: Map<string, SafetyDecision> = new Map();
+  private static readonly CACHE_SIZE = 1024;
+  // An edited command is assessed by the review screen and again when it is
+  // accepted; answer back-to-back repeats without touching the LRU order.
+  private lastCommand: string | null = null;
+  private lastDecision: SafetyDecision = LOW_RISK;
 
   constructor(rules: SafetyRule[]) {
     this.rules = rules;
+    this.combined = SafetyPolicy._combinePatterns(rules);
+    this.anchors = SafetyPolicy._collectAnchors(rules);
+  }
+
+  clearCache(): void {
+    this.cache.clear();
+    this.lastCommand = null;
+  }
+
+  private static _combinePatterns(rules: SafetyRule[]): RegExp | null {
+    if (rules.length === 0) return null;
+    // Numbered backreferences would point at the wrong group once the
+    // patterns are wrapped together; keep the per-rule scan for those.
+    if (rules.some((rule) => /\\[1-9]/.test(rule.pattern))) return null;
+    try {
+      return new RegExp(
+        rules.map((rule, i) => `(?<${ruleGroup(i)}>${rule.pattern})`).join("|"),
+        "i"
+      );
+    } catch {
+      return null;
+    }
+  }
+
+  private static _collectAnchors(rules: SafetyRule[]): string[] | null {
+    if (rules.length === 0) return null;
+    const anchors = new Set<string>();
+    for (const rule of rules) {
+      const literals = leadingLiterals(rule.pattern);
+      if (literals === null) return null;
+      for (const literal of literals) anchors.add(literal);
+    }
+    return [...anchors];
   }
 
   static load(policyPath?: string | null): SafetyPolicy {
@@ -114,7 +185,7 @@ export class SafetyPolicy {
       if (typeof pattern !== "string" || !pattern) continue;
 
       const levelRaw = (obj["level"] as string | undefined)?.toLowerCase() ?? "low";
-      if (!["low", "medium", "high"].includes(levelRaw)) continue;
+      if (!RISK_LEVELS.has(levelRaw)) continue;
 
       const requireConfirmation = Boolean(obj["require_confirmation"] ?? false);
 
@@ -129,7 +200,7 @@ export class SafetyPolicy {
         typeof obj["description"] === "string" ? obj["description"] : null;
 
       rules.push(
-        new SafetyRule({ pattern, level: levelRaw, requireConfirmation, allowedFlags, description })
+        new SafetyRule({ pattern, level: levelRaw as RiskLevel, requireConfirmation, allowedFlags, description })
       );
     }
     return rules;
@@ -164,17 +235,147 @@ export class SafetyPolicy {
   evaluate(command: string): SafetyDecision {
     const normalized = command.trim();
     if (!normalized) {
-      return { level: "low", requireConfirmation: false };
+      return LOW_RISK;
+    }
+    if (normalized === this.lastCommand) return this.lastDecision;
+    let decision = this.cache.get(normalized);
+    if (decision !== undefined) {
+      this.cache.delete(normalized);
+    } else {
+      decision = this._evaluateUncached(normalized);
+      if (this.cache.size >= SafetyPolicy.CACHE_SIZE) {
+        this.cache.delete(this.cache.keys().next().value!);
+      }
+    }
+    this.cache.set(normalized, decision);
+    this.lastCommand = normalized;
+    this.lastDecision = decision;
+    return decision;
+  }
+
+  private _evaluateUncached(normalized: string): SafetyDecision {
+    if (this.anchors) {
+      const lower = normalized.toLowerCase();
+      if (!this.anchors.some((anchor) => lower.includes(anchor))) return LOW_RISK;
+    }
+    // Rules are checked in priority order, so only rules listed before the one
+    // that fired in the combined scan still need an individual check.
+    let limit = this.rules.length;
+    if (this.combined) {
+      const match = this.combined.exec(normalized);
+      if (!match) {
+        return LOW_RISK;
+      }
+      limit = firedRuleIndex(match, this.rules.length);
     }
-    for (const rule of this.rules) {
+    for (let i = 0; i < limit; i++) {
+      const rule = this.rules[i]!;
       if (rule.matches(normalized)) {
         return rule.evaluate(normalized);
       }
     }
-    return { level: "low", requireConfirmation: false };
+    if (limit < this.rules.length) {
+      return this.rules[limit]!.evaluate(normalized);
+    }
+    return LOW_RISK;
   }
 }
 
+// Group names for the combined pattern, shared by every policy so finding
+// the rule that fired doesn't build a name per rule per command.
+const RULE_GROUPS: string[] = [];
+
+function ruleGroup(index: number): string {
+  for (let i = RULE_GROUPS.length; i <= index; i++) RULE_GROUPS.push(`__rule${i}`);
+  return RULE_GROUPS[index]!;
+}
+
+function firedRuleIndex(match: RegExpExecArray, count: number): number {
+  const groups = match.groups ?? {};
+  for (let i = 0; i < count; i++) {
+    if (groups[RULE_GROUPS[i]!] !== undefined) return i;
+  }
+  return count;
+}
+
+// Characters with a meaning of their own in a pattern.
+const REGEX_SYNTAX = new Set([..."\\^$.|?*+()[]{}"]);
+
+/**
+ * Literal text any match of `pattern` must begin with, lower-cased: either one
+ * string or, for a leading group of plain alternatives such as
+ * "\b(halt|reboot)", one string per alternative. Null when the pattern has no
+ * such prefix or has a top-level "|", so callers can't rely on it.
+ */
+function leadingLiterals(pattern: string): string[] | null {
+  if (hasTopLevelAlternation(pattern)) return null;
+  let i = 0;
+  if (pattern[i] === "^") i++;
+  if (pattern.startsWith("\\b", i)) i += 2;
+
+  if (pattern[i] === "(") {
+    const close = pattern.indexOf(")", i);
+    if (close === -1 || QUANTIFIERS.has(pattern[close + 1] ?? "")) return null;
+    let body = pattern.slice(i + 1, close);
+    if (body.startsWith("?:")) body = body.slice(2);
+    const alternatives: string[] = [];
+    for (const alternative of body.split("|")) {
+      const [literal, end] = readLiteral(alternative, 0);
+      if (!literal || end !== alternative.length) return null;
+      alternatives.push(literal);
+    }
+    return alternatives;
+  }
+
+  const [literal] = readLiteral(pattern, i);
+  return literal ? [literal] : null;
+}
+
+// Quantifiers that make the preceding character or group optional.
+const QUANTIFIERS = new Set(["?", "*", "{"]);
+
+/** Read plain and escaped-punctuation characters from `start`; [literal, end]. */
+function readLiteral(pattern: string, start: number): [string, number] {
+  let literal = "";
+  let i = start;
+  while (i < pattern.length) {
+    let ch = pattern[i]!;
+    let width = 1;
+    if (ch === "\\") {
+      const next = pattern[i + 1];
+      // \b, \s, \d, \1, \n ... are classes or escapes, not literal text.
+      if (next === undefined || /[0-9A-Za-z]/.test(next)) break;
+      ch = next;
+      width = 2;
+    } else if (REGEX_SYNTAX.has(ch)) {
+      break;
+    }
+    if (QUANTIFIERS.has(pattern[i + width] ?? "")) break;
+    literal += ch.toLowerCase();
+    i += width;
+  }
+  return [literal, i];
+}
+
+function hasTopLevelAlternation(pattern: string): boolean {
+  let depth = 0;
+  let inClass = false;
+  for (let i = 0; i < pattern.length; i++) {
+    const ch = pattern[i];
+    if (ch === "\\") i++;
+    else if (inClass) inClass = ch !== "]";
+    else if (ch === "[") inClass = true;
+    else if (ch === "(") depth++;
+    else if (ch === ")") depth--;
+    else if (ch === "|" && depth === 0) return true;
+  }
+  return false;
+}
+
+function escapeRegExp(text: string): string {
+  return text.replace(/[.*+?^${}()|[\]\\]/g, "\\$&");
+}
+
 // Template tag helper so we can write raw regex strings without double-escaping
 function r(strings: TemplateStringsArray): string {
   return strings.raw[0]!;
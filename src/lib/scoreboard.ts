@@ -3,7 +3,16 @@
  * Port of CommandScoreboard + CommandStats from agent_shell.py
  */
 
-export class CommandStats {
+/** Read-only view of a command's tally, as handed out by the scoreboard. */
+export interface CommandStatsView {
+  readonly successes: number;
+  readonly failures: number;
+  readonly score: number;
+  readonly total: number;
+  toDict(): { successes: number; failures: number; score: number };
+}
+
+export class CommandStats implements CommandStatsView {
   successes: number;
   failures: number;
 
@@ -37,24 +46,39 @@ export class CommandStats {
   }
 }
 
+const WHITESPACE_RUN = /\s+/g;
+
 export class CommandScoreboard {
   private _scores: Map<string, CommandStats> = new Map();
 
+  // The review screen re-analyzes the same suggestion on every render; keep
+  // recent normalizations so those lookups skip the whitespace pass.
+  private static _normCache: Map<string, string> = new Map();
+  private static readonly NORM_CACHE_SIZE = 1024;
+
   static _normalize(command: string): string {
-    // Collapse whitespace — simple split/join (no shlex needed)
-    const parts = command.trim().split(/\s+/);
-    const normalized = parts.join(" ").trim();
-    return normalized || command.trim();
+    const cache = CommandScoreboard._normCache;
+    let normalized = cache.get(command);
+    if (normalized !== undefined) return normalized;
+    // Collapse whitespace runs (no shlex needed)
+    normalized = command.trim().replace(WHITESPACE_RUN, " ");
+    if (cache.size >= CommandScoreboard.NORM_CACHE_SIZE) {
+      cache.delete(cache.keys().next().value!);
+    }
+    cache.set(command, normalized);
+    return normalized;
   }
 
-  analyze(command: string): [string, CommandStats | null] {
+  // The returned stats are the scoreboard's live entries behind a read-only
+  // type, so lookups from the review screen allocate nothing. Callers that
+  // need a snapshot take toDict().
+
+  analyze(command: string): [string, CommandStatsView | null] {
     const key = CommandScoreboard._normalize(command);
-    const stats = this._scores.get(key);
-    if (stats === undefined) return [key, null];
-    return [key, new CommandStats(stats.successes, stats.failures)];
+    return [key, this._scores.get(key) ?? null];
   }
 
-  record(command: string, success: boolean): [string, CommandStats] {
+  record(command: string, success: boolean): [string, CommandStatsView] {
     const key = CommandScoreboard._normalize(command);
     let stats = this._scores.get(key);
     if (!stats) {
@@ -62,12 +86,10 @@ export class CommandScoreboard {
       this._scores.set(key, stats);
     }
     stats.record(success);
-    return [key, new CommandStats(stats.successes, stats.failures)];
+    return [key, stats];
   }
 
-  statsForKey(key: string): CommandStats | null {
-    const stats = this._scores.get(key);
-    if (stats === undefined) return null;
-    return new CommandStats(stats.successes, stats.failures);
+  statsForKey(key: string): CommandStatsView | null {
+    return this._scores.get(key) ?? null;
   }
 }
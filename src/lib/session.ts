@@ -32,6 +32,18 @@ export class SessionManagerImpl implements SessionManager {
   root: string;
   sessionId: string;
   enabled: boolean;
+  // Goal entries are serialized and appended after recordGoal returns, so
+  // finishing a goal never waits on JSON encoding or disk I/O.
+  private pending: Record<string, any>[] = [];
+  private writing = false;
+  private exitHooked = false;
+  // Data stays here until its append succeeds: the exit hook rewrites an
+  // append still in flight, and a failed one is retried with a growing
+  // delay before the entries are given up on.
+  private unwritten = "";
+  private failures = 0;
+  private static readonly MAX_RETRIES = 3;
+  private static readonly RETRY_DELAY_MS = 500;
 
   constructor(root: string, sessionId: string, enabled: boolean = true) {
     this.root = root;
@@ -78,22 +90,77 @@ export class SessionManagerImpl implements SessionManager {
     metadata: Record<string, any> | null = null
   ): void {
     if (!this.enabled) return;
-    const entry = {
+    this.pending.push({
       timestamp: new Date().toISOString(),
       goal,
       status,
       steps: [...steps],
       metadata: metadata || {},
-    };
+    });
+    if (!this.exitHooked) {
+      this.exitHooked = true;
+      process.once("exit", () => this.flushSync());
+    }
+    if (!this.writing) {
+      this.writing = true;
+      setImmediate(() => this.flush());
+    }
+  }
+
+  private flush(): void {
+    if (this.pending.length === 0 && !this.unwritten) {
+      this.writing = false;
+      return;
+    }
+    const data = this._drain();
+    this.unwritten = data;
+    fs.appendFile(this.path, data, "utf-8", (exc) => {
+      if (exc) {
+        this.failures++;
+        if (this.failures <= SessionManagerImpl.MAX_RETRIES) {
+          const delay = SessionManagerImpl.RETRY_DELAY_MS * this.failures;
+          setTimeout(() => this.flush(), delay).unref();
+          return;
+        }
+        console.warn(`Warning: failed to persist session data: ${exc.message}`);
+      }
+      this.unwritten = "";
+      this.failures = 0;
+      this.flush();
+    });
+  }
+
+  /** Write out anything still queued; used when the process is exiting. */
+  private flushSync(): void {
+    if (this.pending.length === 0 && !this.unwritten) return;
     try {
-      fs.appendFileSync(this.path, JSON.stringify(entry) + "\n", "utf-8");
+      fs.appendFileSync(this.path, this._drain(), "utf-8");
     } catch (exc: any) {
       console.warn(`Warning: failed to persist session data: ${exc.message}`);
     }
   }
 
+  /** Encode queued entries, after any data not yet known to be written. */
+  private _drain(): string {
+    const data =
+      this.unwritten + this.pending.map((entry) => JSON.stringify(entry) + "\n").join("");
+    this.unwritten = "";
+    this.pending = [];
+    return data;
+  }
+
+  /** UTC "YYYYMMDD-HHMMSS", built from the date fields directly. */
   static _generateId(): string {
     const now = new Date();
-    return now.toISOString().slice(0, 19).replace(/[-:]/g, "").replace("T", "-");
+    const pad = (n: number) => (n < 10 ? "0" : "") + n;
+    return (
+      now.getUTCFullYear() +
+      pad(now.getUTCMonth() + 1) +
+      pad(now.getUTCDate()) +
+      "-" +
+      pad(now.getUTCHours()) +
+      pad(now.getUTCMinutes()) +
+      pad(now.getUTCSeconds())
+    );
   }
 }
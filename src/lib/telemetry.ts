@@ -41,10 +41,29 @@ export interface TelemetryEmitter {
 export class TelemetryEmitterImpl implements TelemetryEmitter {
   path: string;
   enabled: boolean;
+  // Events are queued and written in batches off the command loop: a batch
+  // goes out once BATCH_SIZE events are waiting or FLUSH_INTERVAL_MS after
+  // the first one, whichever comes first. Anything left is written on exit.
+  // Encoding happens at write time, so emitting costs no JSON work; queued
+  // events only reference snapshots (plan dicts, scores) that are replaced,
+  // never mutated.
+  private pending: Record<string, any>[] = [];
+  private flushTimer: ReturnType<typeof setTimeout> | null = null;
+  private writing = false;
+  // Batch handed to the write in flight; the exit hook cannot wait for it.
+  private inflight: string | null = null;
+  // Opened in append mode on the first write and kept for the process
+  // lifetime, so each batch is a single write() with no open/close.
+  private fd: number | null = null;
+  private static readonly BATCH_SIZE = 50;
+  private static readonly FLUSH_INTERVAL_MS = 1000;
 
   constructor(filePath: string, enabled: boolean = true) {
     this.path = filePath;
     this.enabled = enabled;
+    if (enabled) {
+      process.once("exit", () => this.flushSync());
+    }
   }
 
   static initialize(filePath?: string): TelemetryEmitterImpl {
@@ -69,15 +88,82 @@ export class TelemetryEmitterImpl implements TelemetryEmitter {
       return;
     }
     
-    const record = { ...payload };
+    this._enqueue({ ...payload });
+  }
+
+  /** Stamp and queue an event object this emitter owns (no defensive copy). */
+  private _enqueue(record: Record<string, any>): void {
     if (record.timestamp == null) record.timestamp = new Date().toISOString();
-    
-    try {
-      fs.appendFileSync(this.path, JSON.stringify(record) + "\n", "utf-8");
-    } catch (error) {
+
+    this.pending.push(record);
+    if (this.pending.length >= TelemetryEmitterImpl.BATCH_SIZE) {
+      this.flush();
+    } else {
+      // Unref'd: a pending batch must not keep the process alive; the exit
+      // hook writes it instead.
+      this.flushTimer ??= setTimeout(
+        () => this.flush(),
+        TelemetryEmitterImpl.FLUSH_INTERVAL_MS
+      ).unref();
+    }
+  }
+
+  private flush(): void {
+    if (this.flushTimer !== null) clearTimeout(this.flushTimer);
+    this.flushTimer = null;
+    // The write in flight picks up whatever queued meanwhile when it ends.
+    if (this.writing || this.pending.length === 0) return;
+    const data = this._drain();
+    this.writing = true;
+    this.inflight = data;
+    const done = () => {
       // Telemetry is best-effort; ignore write failures silently for now.
+      this.writing = false;
+      this.inflight = null;
+      this.flush();
+    };
+    if (this.fd !== null) {
+      fs.write(this.fd, data, null, "utf-8", done);
       return;
     }
+    fs.open(this.path, "a", (exc, fd) => {
+      if (exc) return done();
+      this.fd = fd;
+      fs.write(fd, data, null, "utf-8", done);
+    });
+  }
+
+  /**
+   * Write out anything still queued; used when the process is exiting.
+   * A batch still in flight may never land once the process exits, so it is
+   * written again first (a duplicate beats a lost event). Its fd stays open
+   * because the async write may still be using it; exit closes it anyway.
+   */
+  private flushSync(): void {
+    const inflight = this.inflight;
+    this.inflight = null;
+    try {
+      if (inflight !== null) {
+        fs.appendFileSync(this.path, inflight + this._drain(), "utf-8");
+        return;
+      }
+      if (this.pending.length > 0) {
+        const data = this._drain();
+        if (this.fd !== null) fs.writeSync(this.fd, data, null, "utf-8");
+        else fs.appendFileSync(this.path, data, "utf-8");
+      }
+      if (this.fd !== null) fs.closeSync(this.fd);
+      this.fd = null;
+    } catch {
+      // Telemetry is best-effort; ignore write failures silently for now.
+    }
+  }
+
+  /** Encode every queued event as one block of JSON lines. */
+  private _drain(): string {
+    const data = this.pending.map((event) => JSON.stringify(event) + "\n").join("");
+    this.pending = [];
+    return data;
   }
 
   emitExecution(
@@ -98,7 +184,7 @@ export class TelemetryEmitterImpl implements TelemetryEmitter {
       ...commandEvent,
     };
     
-    this.emit(event);
+    this._enqueue(event);
   }
 
   emitPlanCreated(
@@ -119,7 +205,7 @@ export class TelemetryEmitterImpl implements TelemetryEmitter {
       plan,
     };
     
-    this.emit(event);
+    this._enqueue(event);
   }
 
   emitPlanUpdate(
@@ -144,7 +230,7 @@ export class TelemetryEmitterImpl implements TelemetryEmitter {
       status,
     };
     
-    this.emit(event);
+    this._enqueue(event);
   }
 }
 
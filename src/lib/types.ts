@@ -9,6 +9,8 @@ export interface PlannerTurn {
   stdout: string;
   stderr: string;
   exitCode: number;
+  // Consecutive identical failures folded into this turn (1 when absent)
+  repeatCount?: number;
 }
 
 // PlannerSuggestion indicates the chosen interaction mode
@@ -36,12 +38,14 @@ export interface PlannerPlan {
 export interface CommandResult {
   suggestedCommand: string;
   executedCommand: string;
-  stdout: string[];
-  stderr: string[];
+  stdout: string;
+  stderr: string;
   returncode: number;
-  riskLevel: string;
+  riskLevel: RiskLevel;
   context: Record<string, unknown>;
   safetyNotes?: string | null;
+  // Set when the command ran with safety checks off; riskLevel was not assessed.
+  safetyDisabled?: boolean;
   normalizedCommand?: string | null;
   score?: Record<string, number> | null;
   planStepId?: string | null;
@@ -70,9 +74,12 @@ export interface PlanState {
   steps: PlanStepState[];
 }
 
+// RiskLevel is the closed set of levels a safety decision can carry
+export type RiskLevel = "low" | "medium" | "high";
+
 // SafetyDecision indicates the safety level and requirements for a command
 export interface SafetyDecision {
-  level: string;
+  level: RiskLevel;
   requireConfirmation: boolean;
   notes?: string | null;
 }
@@ -80,7 +87,7 @@ export interface SafetyDecision {
 // SafetyRule defines a rule for determining command safety
 export interface SafetyRule {
   pattern: string;
-  level: string;
+  level: RiskLevel;
   requireConfirmation?: boolean;
   allowedFlags?: string[] | null;
   description?: string | null;
@@ -104,4 +111,5 @@ export interface AppConfig {
   sessionDir: string | null;
   sessionPersist: boolean;
   safetyPolicyPath: string | null;
+  autoAcceptLowRisk: boolean;
 }
\ No newline at end of file